@@ -28,6 +28,8 @@ class Settings(BaseSettings):
     # ML Models
     MODEL_CACHE_DIR: str = "./models"
     MODEL_UPDATE_INTERVAL: int = 3600  # 1 hour
+    # Segment (route) models loaded during warm-up; others load on first use
+    HOT_SEGMENTS: List[str] = []
     
     # External APIs
     FLIGHT_SERVICE_URL: str = "http://localhost:3001"
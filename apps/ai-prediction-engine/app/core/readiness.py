@@ -0,0 +1,36 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class WarmupState:
+    """Startup warm-up progress reported by the /ready endpoint"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self):
+        self.status = "warming"
+        self.started_at = time.time()
+
+    def finish(self, error: Optional[str] = None):
+        self.status = "failed" if error else "ready"
+        self.error = error
+        self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "error": self.error,
+            "elapsed_seconds": elapsed
+        }
@@ -0,0 +1,141 @@
+from typing import Dict
+
+import numpy as np
+
+# Calendar definitions shared by every date-derived feature. Kept identical to
+# apps/ml-service/calendar_table.py so both services agree.
+
+# Bumped whenever a definition below changes, so models record which calendar they
+# were trained with (1 was the ai-prediction-engine's [6, 7, 12] holiday months)
+CALENDAR_VERSION = 2
+
+# Peak travel months (the 'is_holiday_season' model feature)
+HOLIDAY_MONTHS = [6, 7, 8, 12]
+
+# Fixed-date public holidays as (month, day)
+FIXED_HOLIDAYS = [(1, 1), (7, 4), (12, 24), (12, 25), (12, 31)]
+
+# Floating public holidays as (month, weekday, nth occurrence; -1 is the last)
+FLOATING_HOLIDAYS = [
+    (5, 0, -1),  # Memorial Day
+    (9, 0, 1),   # Labor Day
+    (11, 3, 4),  # Thanksgiving
+]
+
+# School breaks as inclusive ((month, day), (month, day)) ranges
+SCHOOL_BREAKS = [
+    ((1, 1), (1, 5)),
+    ((3, 10), (3, 24)),
+    ((6, 15), (8, 31)),
+    ((12, 20), (12, 31)),
+]
+
+# Days either side of a public holiday that count as peak travel
+PEAK_HOLIDAY_DAYS = 2
+
+CALENDAR_COLUMNS = (
+    'day_of_week',
+    'month',
+    'day',
+    'is_weekend',
+    'is_holiday_season',
+    'is_public_holiday',
+    'is_school_break',
+    'is_peak_season',
+)
+
+# Range served from the precomputed table; other days are computed on demand
+TABLE_START = '2000-01-01'
+TABLE_END = '2100-12-31'
+
+
+def _month_day(days: np.ndarray):
+    months = days.astype('datetime64[M]')
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+    return months, month, day
+
+
+def _public_holidays(days: np.ndarray) -> np.ndarray:
+    months, month, day = _month_day(days)
+    # 1970-01-01 was a Thursday, weekday 3
+    day_of_week = (days.astype(np.int64) + 3) % 7
+    holiday = np.zeros(len(days), dtype=bool)
+    for m, d in FIXED_HOLIDAYS:
+        holiday |= (month == m) & (day == d)
+
+    days_in_month = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+    for m, weekday, nth in FLOATING_HOLIDAYS:
+        if nth > 0:
+            occurrence = (day - 1) // 7 + 1 == nth
+        else:
+            occurrence = day + 7 > days_in_month
+        holiday |= (month == m) & (day_of_week == weekday) & occurrence
+    return holiday
+
+
+def calendar_features(days: np.ndarray) -> np.ndarray:
+    """(n, len(CALENDAR_COLUMNS)) int16 calendar rows for datetime64[D] days"""
+    days = np.asarray(days, dtype='datetime64[D]').reshape(-1)
+    _, month, day = _month_day(days)
+    day_of_week = (days.astype(np.int64) + 3) % 7
+    month_day = month * 100 + day
+
+    school_break = np.zeros(len(days), dtype=bool)
+    for (start_month, start_day), (end_month, end_day) in SCHOOL_BREAKS:
+        school_break |= (month_day >= start_month * 100 + start_day) & (month_day <= end_month * 100 + end_day)
+
+    holiday = _public_holidays(days)
+    near_holiday = holiday.copy()
+    for shift in range(1, PEAK_HOLIDAY_DAYS + 1):
+        near_holiday |= _public_holidays(days - shift) | _public_holidays(days + shift)
+
+    return np.column_stack([
+        day_of_week,
+        month,
+        day,
+        day_of_week >= 5,
+        np.isin(month, HOLIDAY_MONTHS),
+        holiday,
+        school_break,
+        school_break | near_holiday,
+    ]).astype(np.int16)
+
+
+class CalendarTable:
+    """
+    Calendar features precomputed per day and indexed by day ordinal.
+
+    Feature extraction parses a batch's dates once into datetime64[D] and
+    reads every calendar column with a single row gather, instead of
+    deriving weekday, month and the holiday flags per request. Days outside
+    the table are computed on demand with the same definitions.
+    """
+
+    def __init__(self, start: str = TABLE_START, end: str = TABLE_END):
+        self.start = np.datetime64(start, 'D')
+        days = np.arange(self.start, np.datetime64(end, 'D') + 1, dtype='datetime64[D]')
+        self.rows = calendar_features(days)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.rows.nbytes)
+
+    def lookup(self, days: np.ndarray) -> Dict[str, np.ndarray]:
+        """Calendar columns by name for datetime64[D] days of any shape"""
+        days = np.asarray(days, dtype='datetime64[D]')
+        index = (days - self.start).astype(np.int64).reshape(-1)
+        inside = (index >= 0) & (index < len(self.rows))
+        if inside.all():
+            rows = self.rows[index]
+        else:
+            rows = np.empty((len(index), self.rows.shape[1]), dtype=self.rows.dtype)
+            rows[inside] = self.rows[index[inside]]
+            rows[~inside] = calendar_features(days.reshape(-1)[~inside])
+        return {
+            column: rows[:, i].reshape(days.shape)
+            for i, column in enumerate(CALENDAR_COLUMNS)
+        }
+
+
+CALENDAR = CalendarTable()
@@ -0,0 +1,87 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import joblib
+import numpy as np
+
+# Below this many values a dict lookup beats building a hash index
+VECTORIZE_THRESHOLD = 64
+
+
+class CategoryIndex:
+    """
+    Persistent category -> code index for the label-encoded columns.
+
+    Codes start as each LabelEncoder's class positions, so they match
+    `encoder.transform`. Categories added later get the next free codes
+    without refitting the encoders. Unknown values map to UNKNOWN.
+    """
+
+    UNKNOWN = -1
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        self._categories: Dict[str, List[str]] = {}
+        self._codes: Dict[str, Dict[str, int]] = {}
+        # pandas Index per column, built lazily for whole-column lookups
+        self._indexes: Dict[str, Any] = {}
+        for col, values in (categories or {}).items():
+            self.add_categories(col, values)
+
+    @classmethod
+    def from_encoders(cls, encoders: Dict) -> 'CategoryIndex':
+        """Build the index from fitted LabelEncoders"""
+        return cls({col: [str(value) for value in encoder.classes_] for col, encoder in encoders.items()})
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._categories)
+
+    def __contains__(self, col: str) -> bool:
+        return col in self._codes
+
+    def categories(self, col: str) -> List[str]:
+        return list(self._categories[col])
+
+    def code(self, col: str, value) -> int:
+        """Code for a single value"""
+        return self._codes[col].get(str(value), self.UNKNOWN)
+
+    def encode(self, col: str, values: Iterable) -> np.ndarray:
+        """Vectorized codes for a whole column; unknown values map to UNKNOWN"""
+        if not hasattr(values, '__len__'):
+            values = list(values)
+        if len(values) < VECTORIZE_THRESHOLD:
+            codes = self._codes[col]
+            return np.fromiter(
+                (codes.get(str(value), self.UNKNOWN) for value in values),
+                dtype=np.int64,
+                count=len(values)
+            )
+
+        import pandas as pd
+        
+        index = self._indexes.get(col)
+        if index is None:
+            index = self._indexes[col] = pd.Index(self._categories[col])
+        return index.get_indexer(pd.Index(values).astype(str)).astype(np.int64)
+
+    def add_categories(self, col: str, values: Iterable) -> np.ndarray:
+        """Register unseen values with new codes and return the codes of all values"""
+        categories = self._categories.setdefault(col, [])
+        codes = self._codes.setdefault(col, {})
+        result = []
+        for value in values:
+            value = str(value)
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(categories)
+                categories.append(value)
+                self._indexes.pop(col, None)
+            result.append(code)
+        return np.asarray(result, dtype=np.int64)
+
+    def save(self, path: str):
+        joblib.dump(self._categories, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CategoryIndex':
+        return cls(joblib.load(path))
@@ -0,0 +1,122 @@
+import warnings
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from app.ml.calendar_table import CALENDAR
+from app.ml.category_index import CategoryIndex
+
+ENCODED_SUFFIX = '_encoded'
+
+
+def _parse_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        # Non-ISO inputs are rare; pandas parses them the same way prepare_features does
+        import pandas as pd
+        return pd.Timestamp(value).to_pydatetime()
+
+
+def _parse_datetimes(values: List) -> np.ndarray:
+    """datetime64[us] for a batch of dates, parsed in one NumPy call when every value allows it"""
+    try:
+        with warnings.catch_warnings():
+            # NumPy drops timezone offsets with a warning; such values take the per-value path
+            warnings.simplefilter('error')
+            return np.array(values, dtype='datetime64[us]')
+    except (ValueError, TypeError, Warning):
+        return np.array([_parse_datetime(value) for value in values], dtype='datetime64[us]')
+
+
+class CompiledFeaturePipeline:
+    """
+    Dict-to-matrix feature pipeline equivalent to
+    prepare_features -> encode_categorical_features -> StandardScaler.transform,
+    without building a DataFrame.
+
+    Built once at train/load time from the fitted scaler and category index; every
+    transform is plain NumPy over the requested rows.
+    """
+
+    def __init__(
+        self,
+        feature_columns: List[str],
+        mean: Optional[np.ndarray],
+        scale: Optional[np.ndarray],
+        category_index: CategoryIndex
+    ):
+        self.feature_columns = list(feature_columns)
+        self.mean = mean
+        self.scale = scale
+        self.category_index = category_index
+
+    @classmethod
+    def from_model(
+        cls, feature_columns: List[str], scaler, category_index: CategoryIndex
+    ) -> 'CompiledFeaturePipeline':
+        """Precompute scaler parameters; categorical codes come from the shared category index"""
+        for col in feature_columns:
+            if col.endswith(ENCODED_SUFFIX) and col[:-len(ENCODED_SUFFIX)] not in category_index:
+                raise KeyError(f"No category index for {col}")
+
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        return cls(
+            feature_columns,
+            None if mean is None else np.asarray(mean, dtype=np.float64),
+            None if scale is None else np.asarray(scale, dtype=np.float64),
+            category_index
+        )
+
+    def _date_features(self, records: List[Dict], now: datetime) -> Dict[str, np.ndarray]:
+        departures = _parse_datetimes([record['departure_date'] for record in records])
+        days = departures.astype('datetime64[D]')
+        calendar = CALENDAR.lookup(days)
+
+        hour = (departures - days).astype('timedelta64[h]').astype(np.float64)
+        # Floor division, like timedelta.days
+        days_until = ((departures - np.datetime64(now, 'us')) // np.timedelta64(1, 'D')).astype(np.float64)
+        booking_window = np.clip(days_until, 0, 365)
+
+        return {
+            'departure_hour': hour,
+            'departure_day_of_week': calendar['day_of_week'].astype(np.float64),
+            'departure_month': calendar['month'].astype(np.float64),
+            'days_until_departure': days_until,
+            'is_weekend': calendar['is_weekend'].astype(np.float64),
+            'is_holiday_season': calendar['is_holiday_season'].astype(np.float64),
+            'booking_window': booking_window,
+            'is_last_minute': (booking_window <= 7).astype(np.float64),
+            'is_early_booking': (booking_window >= 60).astype(np.float64),
+        }
+
+    def _category_values(self, records: List[Dict], base: str) -> List[str]:
+        if base == 'route':
+            return [f"{record['origin']}_{record['destination']}" for record in records]
+        return [str(record[base]) for record in records]
+
+    def transform(self, flight_data: Union[Dict, List[Dict]], now: Optional[datetime] = None) -> np.ndarray:
+        """Turn one flight dict or a list of them into a scaled float32 matrix"""
+        records = [flight_data] if isinstance(flight_data, dict) else list(flight_data)
+        n = len(records)
+        derived = self._date_features(records, now or datetime.now())
+
+        X = np.empty((n, len(self.feature_columns)), dtype=np.float64)
+        for j, col in enumerate(self.feature_columns):
+            if col in derived:
+                X[:, j] = derived[col]
+            elif col.endswith(ENCODED_SUFFIX):
+                base = col[:-len(ENCODED_SUFFIX)]
+                X[:, j] = self.category_index.encode(base, self._category_values(records, base))
+            else:
+                X[:, j] = np.fromiter((record[col] for record in records), dtype=np.float64, count=n)
+
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+
+        return X.astype(np.float32)
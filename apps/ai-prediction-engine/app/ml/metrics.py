@@ -0,0 +1,15 @@
+from typing import Dict
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+
+def regression_metrics(y_true, y_pred) -> Dict:
+    """MAE, MSE, RMSE and R² for a set of predictions"""
+    mse = mean_squared_error(y_true, y_pred)
+    return {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'mse': mse,
+        'rmse': np.sqrt(mse),
+        'r2': r2_score(y_true, y_pred)
+    }
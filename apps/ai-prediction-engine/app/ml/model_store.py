@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+CURRENT_POINTER = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+VERSIONS_DIR = 'versions'
+STAGING_PREFIX = '.staging-'
+
+# Version ids start with the UTC publish time to the microsecond, so they sort
+# in publish order; ids from before carry whole seconds and sort ahead of them
+VERSION_TIME_FORMAT = '%Y%m%dT%H%M%S%f'
+
+# Staging directories older than this are leftovers of a crashed writer
+STALE_STAGING_SECONDS = 3600
+
+
+def _fsync_file(path: str):
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(path: str):
+    # Directory fsync makes renames durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelStore:
+    """
+    Versioned on-disk model store.
+
+    Every save is written into a staging directory, described by a manifest
+    and renamed to versions/<version>; the CURRENT pointer is then replaced
+    atomically. Readers resolve CURRENT once and read a single immutable
+    version directory, so they never see a mix of old and new files.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+
+    def version_path(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, CURRENT_POINTER)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def list_versions(self) -> List[str]:
+        """Published versions, oldest first"""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if not name.startswith('.') and os.path.exists(os.path.join(self.versions_dir, name, MANIFEST_FILE))
+        )
+
+    def read_manifest(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self.version_path(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def publish(
+        self,
+        write: Callable[[str], Optional[Dict[str, Any]]],
+        base_version: Optional[str] = None,
+        inherit: Iterable[str] = (),
+        activate: bool = True
+    ) -> str:
+        """
+        Write a new version and (by default) make it current.
+
+        `write(path)` fills the staging directory and may return extra manifest
+        fields. Files of `base_version` under the `inherit` prefixes that the
+        writer did not produce are hard-linked in, so unchanged artifacts are
+        carried over without copying.
+        """
+        os.makedirs(self.versions_dir, exist_ok=True)
+        version = self._new_version()
+        staging = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=self.versions_dir)
+
+        try:
+            extra = write(staging) or {}
+            if base_version is not None and inherit:
+                self._inherit(base_version, staging, tuple(inherit))
+
+            files = {}
+            for directory, _, names in os.walk(staging):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    _fsync_file(path)
+                    files[os.path.relpath(path, staging).replace(os.sep, '/')] = {
+                        'bytes': os.path.getsize(path),
+                        'sha256': _sha256(path)
+                    }
+
+            manifest = {
+                'version': version,
+                'created_at': datetime.utcnow().isoformat(),
+                'base_version': base_version,
+                'files': files,
+                **extra
+            }
+            manifest_path = os.path.join(staging, MANIFEST_FILE)
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(staging)
+
+            os.rename(staging, self.version_path(version))
+            _fsync_dir(self.versions_dir)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def _new_version(self) -> str:
+        """Unique version id that sorts after every published one, even if the clock stepped back"""
+        stamp = datetime.utcnow()
+        latest = self.list_versions()[-1:]
+        if latest:
+            try:
+                previous = datetime.strptime(latest[0].split('-')[0], VERSION_TIME_FORMAT)
+            except ValueError:
+                # Whole-second id from before; it already sorts ahead of any microsecond id
+                previous = None
+            if previous is not None and stamp <= previous:
+                stamp = previous + timedelta(microseconds=1)
+        return f"{stamp.strftime(VERSION_TIME_FORMAT)}-{uuid.uuid4().hex[:6]}"
+
+    def _inherit(self, base_version: str, staging: str, prefixes: Tuple[str, ...]):
+        base_path = self.version_path(base_version)
+        for rel_path in self.read_manifest(base_version)['files']:
+            if not rel_path.startswith(prefixes):
+                continue
+            target = os.path.join(staging, rel_path)
+            if os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(os.path.join(base_path, rel_path), target)
+            except OSError:
+                shutil.copy2(os.path.join(base_path, rel_path), target)
+
+    def activate(self, version: str):
+        """Atomically point CURRENT at a published version (also used for rollback)"""
+        if not os.path.exists(os.path.join(self.version_path(version), MANIFEST_FILE)):
+            raise FileNotFoundError(f"Model version {version} is not published")
+
+        tmp_path = os.path.join(self.root, f'.{CURRENT_POINTER}.{uuid.uuid4().hex}')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_POINTER))
+        _fsync_dir(self.root)
+        logger.info(f"Model version {version} is now current")
+
+    def verify(self, version: str, checksums: bool = False) -> bool:
+        """Check every manifest file is present with the recorded size (and hash)"""
+        path = self.version_path(version)
+        try:
+            manifest = self.read_manifest(version)
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable manifest for model version {version}: {e}")
+            return False
+
+        for rel_path, meta in manifest['files'].items():
+            file_path = os.path.join(path, rel_path)
+            if not os.path.exists(file_path) or os.path.getsize(file_path) != meta['bytes']:
+                logger.error(f"Model version {version} is missing or truncated: {rel_path}")
+                return False
+            if checksums and _sha256(file_path) != meta['sha256']:
+                logger.error(f"Model version {version} failed checksum: {rel_path}")
+                return False
+        return True
+
+    def prune(self, keep: int) -> List[str]:
+        """Delete all but the newest `keep` versions (never the current one) and stale staging dirs"""
+        current = self.current_version()
+        versions = self.list_versions()
+        removed = [
+            version for version in versions[:max(0, len(versions) - keep)]
+            if version != current
+        ]
+        for version in removed:
+            # Readers that memory-mapped these files keep their mappings after unlink
+            shutil.rmtree(self.version_path(version), ignore_errors=True)
+
+        if os.path.isdir(self.versions_dir):
+            now = time.time()
+            for name in os.listdir(self.versions_dir):
+                path = os.path.join(self.versions_dir, name)
+                if name.startswith(STAGING_PREFIX) and now - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+
+class LiveModel:
+    """
+    Serving handle for the current version of a ModelStore.
+
+    Callers take `get()` once per request and use that instance throughout;
+    `refresh()` loads a newer version into a fresh instance beside the
+    serving one and then swaps a single reference, so in-flight predictions
+    finish on the version they started with and never wait on a load.
+    """
+
+    def __init__(self, store: ModelStore, load: Callable[[str], Optional[Any]]):
+        self.store = store
+        self._load = load
+        self._current: Tuple[Optional[str], Optional[Any]] = (None, None)
+        # Serializes loaders only; readers never take it
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._current[0]
+
+    def get(self) -> Optional[Any]:
+        return self._current[1]
+
+    def refresh(self) -> bool:
+        """Load and swap in the store's current version if it changed; True if swapped"""
+        version = self.store.current_version()
+        if version is None or version == self.version:
+            return False
+
+        with self._refresh_lock:
+            if version == self.version:
+                return False
+            started = time.perf_counter()
+            model = self._load(version)
+            if model is None:
+                logger.error(f"Keeping model version {self.version}: loading {version} failed")
+                return False
+            previous = self.version
+            self._current = (version, model)
+
+        logger.info(f"Swapped model version {previous} -> {version} in {time.perf_counter() - started:.2f}s")
+        return True
+
+    async def watch(self, interval: float):
+        """Poll the CURRENT pointer and hot-swap new versions, loading off the event loop"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"Model refresh failed: {e}")
+            await asyncio.sleep(interval)
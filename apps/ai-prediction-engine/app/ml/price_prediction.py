@@ -1,15 +1,34 @@
+from __future__ import annotations
+
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
-import pandas as pd
+from app.ml.calendar_table import CALENDAR, CALENDAR_VERSION
+from app.ml.category_index import CategoryIndex
+from app.ml.feature_pipeline import CompiledFeaturePipeline
+from app.ml.model_store import LiveModel, ModelStore
+from app.ml.uncertainty import TreeSpread
 from loguru import logger
-from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+# pandas, the sklearn estimators/metrics and the training helpers are imported
+# inside the methods that need them, so the serving path (load_models + the
+# compiled pipeline) starts without paying for them.
+if TYPE_CHECKING:
+    import pandas as pd
+    from app.ml.streaming import ChunkSource
+
+CATEGORICAL_COLUMNS = ['airline', 'origin', 'destination', 'cabin', 'route']
+BASE_FEATURE_COLUMNS = [
+    'duration', 'stops', 'days_until_departure', 'departure_hour',
+    'departure_day_of_week', 'departure_month', 'booking_window',
+    'is_weekend', 'is_holiday_season', 'is_last_minute', 'is_early_booking'
+]
 
 
 class PricePredictionModel:
@@ -17,34 +36,45 @@ class PricePredictionModel:
     Flight price prediction model using ensemble methods
     """
     
-    def __init__(self, model_cache_dir: str = "./models"):
+    def __init__(self, model_cache_dir: str = "./models", keep_versions: int = 3):
         self.model_cache_dir = model_cache_dir
+        self.store = ModelStore(os.path.join(model_cache_dir, 'price_prediction'))
+        self.keep_versions = keep_versions
+        # Store version the in-memory models were saved as or loaded from
+        self.version: Optional[str] = None
         self.models = {}
         self.scalers = {}
         self.encoders = {}
+        self.category_index = CategoryIndex()
         self.feature_columns = []
+        self.feature_pipeline: Optional[CompiledFeaturePipeline] = None
+        self.segment_models = {}
+        # Per-tree spread of the random forest member, rebuilt when that model is replaced
+        self._tree_spread: Optional[TreeSpread] = None
         
         # Ensure model directory exists
         os.makedirs(model_cache_dir, exist_ok=True)
     
     def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Prepare features for training/prediction"""
+        import pandas as pd
+        
         df = data.copy()
         
-        # Time-based features
-        df['departure_hour'] = pd.to_datetime(df['departure_date']).dt.hour
-        df['departure_day_of_week'] = pd.to_datetime(df['departure_date']).dt.dayofweek
-        df['departure_month'] = pd.to_datetime(df['departure_date']).dt.month
-        df['days_until_departure'] = (
-            pd.to_datetime(df['departure_date']) - datetime.now()
-        ).dt.days
+        # Time-based features: dates are parsed once, calendar columns come from the shared day table
+        departure = pd.to_datetime(df['departure_date'])
+        calendar = CALENDAR.lookup(departure.to_numpy(dtype='datetime64[D]'))
+        df['departure_hour'] = departure.dt.hour
+        df['departure_day_of_week'] = calendar['day_of_week'].astype(int)
+        df['departure_month'] = calendar['month'].astype(int)
+        df['days_until_departure'] = (departure - datetime.now()).dt.days
         
         # Route features
         df['route'] = df['origin'] + '_' + df['destination']
         
         # Seasonal features
-        df['is_weekend'] = df['departure_day_of_week'].isin([5, 6]).astype(int)
-        df['is_holiday_season'] = df['departure_month'].isin([6, 7, 12]).astype(int)
+        df['is_weekend'] = calendar['is_weekend'].astype(int)
+        df['is_holiday_season'] = calendar['is_holiday_season'].astype(int)
         
         # Advanced booking features
         df['booking_window'] = np.clip(df['days_until_departure'], 0, 365)
@@ -55,25 +85,38 @@ class PricePredictionModel:
     
     def encode_categorical_features(self, df: pd.DataFrame, fit: bool = False) -> pd.DataFrame:
         """Encode categorical features"""
-        categorical_cols = ['airline', 'origin', 'destination', 'cabin', 'route']
+        from sklearn.preprocessing import LabelEncoder
         
-        for col in categorical_cols:
+        for col in CATEGORICAL_COLUMNS:
             if col in df.columns:
                 if fit:
                     if col not in self.encoders:
                         self.encoders[col] = LabelEncoder()
                     df[f'{col}_encoded'] = self.encoders[col].fit_transform(df[col].astype(str))
                 else:
-                    if col in self.encoders:
-                        # Handle unseen categories
-                        df[f'{col}_encoded'] = df[col].astype(str).map(
-                            dict(zip(self.encoders[col].classes_, self.encoders[col].transform(self.encoders[col].classes_)))
-                        ).fillna(-1)
+                    if col in self.category_index:
+                        # Unseen categories map to CategoryIndex.UNKNOWN (-1)
+                        df[f'{col}_encoded'] = self.category_index.encode(col, df[col])
+        
+        if fit:
+            self.category_index = CategoryIndex.from_encoders(self.encoders)
         
         return df
     
-    def train(self, training_data: pd.DataFrame, target_column: str = 'price') -> Dict:
-        """Train the price prediction model"""
+    def train(
+        self,
+        training_data: pd.DataFrame,
+        target_column: str = 'price',
+        parallel: bool = True,
+        max_workers: Optional[int] = None
+    ) -> Dict:
+        """Train the price prediction model; ensemble members fit concurrently unless parallel=False"""
+        from app.ml.metrics import regression_metrics
+        from app.ml.training_orchestrator import fit_members_parallel
+        from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
         logger.info("Starting price prediction model training")
         
         # Prepare features
@@ -81,11 +124,7 @@ class PricePredictionModel:
         df = self.encode_categorical_features(df, fit=True)
         
         # Select features
-        feature_cols = [
-            'duration', 'stops', 'days_until_departure', 'departure_hour',
-            'departure_day_of_week', 'departure_month', 'booking_window',
-            'is_weekend', 'is_holiday_season', 'is_last_minute', 'is_early_booking'
-        ]
+        feature_cols = list(BASE_FEATURE_COLUMNS)
         
         # Add encoded categorical features
         encoded_cols = [col for col in df.columns if col.endswith('_encoded')]
@@ -107,50 +146,233 @@ class PricePredictionModel:
         self.scalers['price'] = StandardScaler()
         X_train_scaled = self.scalers['price'].fit_transform(X_train)
         X_test_scaled = self.scalers['price'].transform(X_test)
+        self.compile_feature_pipeline()
+        
+        # Segment models were fit on the previous scaler and encoders
+        self.segment_models = {}
         
         # Train ensemble models
-        models = {
-            'random_forest': RandomForestRegressor(
-                n_estimators=100, max_depth=10, random_state=42, n_jobs=-1
-            ),
-            'gradient_boosting': GradientBoostingRegressor(
-                n_estimators=100, max_depth=6, random_state=42
-            )
+        members = {
+            'random_forest': (RandomForestRegressor, {
+                'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': -1
+            }),
+            'gradient_boosting': (GradientBoostingRegressor, {
+                'n_estimators': 100, 'max_depth': 6, 'random_state': 42
+            })
         }
         
-        results = {}
+        if parallel:
+            logger.info(f"Training {', '.join(members)} models in parallel")
+            self.models, results = fit_members_parallel(
+                members, X_train_scaled, y_train, X_test_scaled, y_test, max_workers=max_workers
+            )
+        else:
+            results = {}
+            for name, (estimator_cls, params) in members.items():
+                logger.info(f"Training {name} model")
+                started = time.perf_counter()
+                model = estimator_cls(**params).fit(X_train_scaled, y_train)
+                seconds = time.perf_counter() - started
+                
+                # Evaluate
+                y_pred = model.predict(X_test_scaled)
+                results[name] = {**regression_metrics(y_test, y_pred), 'train_seconds': seconds}
+                self.models[name] = model
+        
+        for name, metrics in results.items():
+            logger.info(
+                f"{name} - MAE: {metrics['mae']:.2f}, RMSE: {metrics['rmse']:.2f}, "
+                f"R²: {metrics['r2']:.3f}, {metrics['train_seconds']:.1f}s"
+            )
         
-        for name, model in models.items():
-            logger.info(f"Training {name} model")
-            model.fit(X_train_scaled, y_train)
-            
-            # Evaluate
-            y_pred = model.predict(X_test_scaled)
-            
-            metrics = {
-                'mae': mean_absolute_error(y_test, y_pred),
-                'mse': mean_squared_error(y_test, y_pred),
-                'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
-                'r2': r2_score(y_test, y_pred)
-            }
-            
+        # Save models
+        self.save_models()
+        
+        return results
+    
+    def train_segments(
+        self,
+        training_data: pd.DataFrame,
+        segment_column: str = 'route',
+        target_column: str = 'price',
+        max_workers: Optional[int] = None
+    ) -> Dict:
+        """
+        Train one random forest per segment (route by default) across a process
+        pool, reusing the fitted scaler and category index of the main model.
+        """
+        from app.ml.training_orchestrator import fit_segments_parallel
+        from sklearn.ensemble import RandomForestRegressor
+        
+        if 'price' not in self.scalers:
+            raise ValueError("Train or load the main model before segment models")
+        
+        df = self.prepare_features(training_data)
+        df = self.encode_categorical_features(df, fit=False)
+        X_scaled = self.scalers['price'].transform(df[self.feature_columns])
+        
+        spec = (RandomForestRegressor, {'n_estimators': 100, 'max_depth': 10, 'random_state': 42, 'n_jobs': -1})
+        self.segment_models, results = fit_segments_parallel(
+            spec, X_scaled, df[target_column].to_numpy(), df[segment_column].to_numpy(), max_workers=max_workers
+        )
+        
+        # Segments absent from this data keep their models from the base version
+        self.save_models(inherit_segments=True)
+        
+        return results
+    
+    def train_streaming(
+        self,
+        source: ChunkSource,
+        target_column: str = 'price',
+        chunksize: int = 100_000,
+        epochs: int = 1,
+        sample_rows: int = 200_000,
+        holdout_every: int = 5,
+        holdout_rows: int = 50_000,
+        track_memory: bool = False
+    ) -> Dict:
+        """
+        Train out-of-core from chunked CSV/Parquet (a path) or a callable
+        returning a fresh iterator of DataFrame chunks.
+        
+        Pass 1 collects categories, pass 2 fits scaler statistics with
+        partial_fit, and the training passes fit an SGD model incrementally
+        while a fixed-size reservoir sample feeds a histogram gradient
+        boosting model. Every `holdout_every`-th row goes to a bounded
+        holdout sample for evaluation. Peak memory stays proportional to
+        `chunksize + sample_rows + holdout_rows`.
+        """
+        import tracemalloc
+        
+        from app.ml.metrics import regression_metrics
+        from app.ml.streaming import ReservoirSample, open_source, peak_rss_mb
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+        
+        logger.info("Starting streaming price prediction model training")
+        started = time.perf_counter()
+        if track_memory:
+            tracemalloc.start()
+        
+        # Pass 1: category vocabularies and available feature columns
+        categories: Dict[str, set] = {}
+        feature_cols: List[str] = []
+        rows = 0
+        chunks = 0
+        for chunk in open_source(source, chunksize):
+            df = self.prepare_features(chunk)
+            if not feature_cols:
+                feature_cols = [col for col in BASE_FEATURE_COLUMNS if col in df.columns]
+                feature_cols += [f'{col}_encoded' for col in CATEGORICAL_COLUMNS if col in df.columns]
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns:
+                    categories.setdefault(col, set()).update(df[col].astype(str).unique())
+            rows += len(df)
+            chunks += 1
+        
+        if rows == 0:
+            raise ValueError("Streaming source produced no rows")
+        
+        # Encoders equivalent to LabelEncoder.fit over the full stream
+        self.encoders = {}
+        for col, values in categories.items():
+            encoder = LabelEncoder()
+            encoder.classes_ = np.array(sorted(values), dtype=object)
+            self.encoders[col] = encoder
+        self.category_index = CategoryIndex.from_encoders(self.encoders)
+        self.feature_columns = feature_cols
+        
+        def encoded_chunks():
+            offset = 0
+            for chunk in open_source(source, chunksize):
+                df = self.encode_categorical_features(self.prepare_features(chunk), fit=False)
+                X = df[feature_cols].to_numpy(dtype=np.float64)
+                y = df[target_column].to_numpy(dtype=np.float64)
+                is_holdout = (np.arange(offset, offset + len(df)) % holdout_every) == 0
+                offset += len(df)
+                yield X, y, is_holdout
+        
+        # Pass 2: incremental scaler statistics over training rows
+        scaler = StandardScaler()
+        for X, _, is_holdout in encoded_chunks():
+            if (~is_holdout).any():
+                scaler.partial_fit(X[~is_holdout])
+        self.scalers['price'] = scaler
+        self.compile_feature_pipeline()
+        self.segment_models = {}
+        
+        # Training passes
+        sgd = SGDRegressor(random_state=42)
+        reservoir = ReservoirSample(sample_rows, len(feature_cols))
+        holdout = ReservoirSample(holdout_rows, len(feature_cols), random_state=7)
+        timings = {}
+        
+        sgd_started = time.perf_counter()
+        for epoch in range(epochs):
+            for X, y, is_holdout in encoded_chunks():
+                X_scaled = scaler.transform(X).astype(np.float32)
+                train_rows = ~is_holdout
+                if train_rows.any():
+                    sgd.partial_fit(X_scaled[train_rows], y[train_rows])
+                if epoch == 0:
+                    reservoir.add(X_scaled[train_rows], y[train_rows])
+                    holdout.add(X_scaled[is_holdout], y[is_holdout])
+        timings['sgd'] = time.perf_counter() - sgd_started
+        
+        hist_started = time.perf_counter()
+        hist = HistGradientBoostingRegressor(max_iter=100, max_depth=6, random_state=42)
+        hist.fit(*reservoir.arrays())
+        timings['hist_gradient_boosting'] = time.perf_counter() - hist_started
+        
+        self.models = {'sgd': sgd, 'hist_gradient_boosting': hist}
+        
+        # Evaluate on the holdout sample
+        results = {}
+        X_holdout, y_holdout = holdout.arrays()
+        for name, model in self.models.items():
+            metrics = regression_metrics(y_holdout, model.predict(X_holdout)) if len(y_holdout) else {}
+            metrics['train_seconds'] = timings[name]
             results[name] = metrics
-            self.models[name] = model
-            
-            logger.info(f"{name} - MAE: {metrics['mae']:.2f}, RMSE: {metrics['rmse']:.2f}, R²: {metrics['r2']:.3f}")
+            logger.info(f"{name} - {metrics}")
+        
+        stats = {
+            'rows': rows,
+            'chunks': chunks,
+            'epochs': epochs,
+            'reservoir_rows': reservoir.size,
+            'holdout_rows': holdout.size,
+            'sample_bytes': reservoir.nbytes + holdout.nbytes,
+            'elapsed_seconds': time.perf_counter() - started,
+            'peak_rss_mb': peak_rss_mb()
+        }
+        if track_memory:
+            stats['peak_traced_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        results['streaming'] = stats
+        logger.info(f"Streaming training finished: {stats}")
         
         # Save models
         self.save_models()
         
         return results
     
-    def predict(self, flight_data: Dict) -> Dict:
-        """Predict flight price"""
-        if not self.models:
-            raise ValueError("Models not trained or loaded")
+    def compile_feature_pipeline(self):
+        """Build the DataFrame-free inference pipeline from the fitted scaler and encoders"""
+        try:
+            self.feature_pipeline = CompiledFeaturePipeline.from_model(
+                self.feature_columns, self.scalers['price'], self.category_index
+            )
+        except Exception as e:
+            logger.warning(f"Falling back to DataFrame feature path: {e}")
+            self.feature_pipeline = None
+    
+    def _transform_dataframe(self, flight_data: List[Dict]) -> np.ndarray:
+        """Reference feature path through pandas"""
+        import pandas as pd
         
-        # Convert to DataFrame
-        df = pd.DataFrame([flight_data])
+        df = pd.DataFrame(flight_data)
         
         # Prepare features
         df = self.prepare_features(df)
@@ -160,73 +382,214 @@ class PricePredictionModel:
         X = df[self.feature_columns]
         
         # Scale features
-        X_scaled = self.scalers['price'].transform(X)
+        return self.scalers['price'].transform(X)
+    
+    def add_categories(self, col: str, values: List[str]) -> np.ndarray:
+        """Register new categorical values without refitting the encoders"""
+        return self.category_index.add_categories(col, values)
+    
+    def predict(self, flight_data: Dict) -> Dict:
+        """Predict flight price"""
+        return self.predict_batch([flight_data])[0]
+    
+    def predict_batch(self, flights: List[Dict]) -> List[Dict]:
+        """Predict prices for several flights with one model call per ensemble member"""
+        if not self.models:
+            raise ValueError("Models not trained or loaded")
         
-        # Get predictions from all models
-        predictions = {}
-        for name, model in self.models.items():
-            pred = model.predict(X_scaled)[0]
-            predictions[name] = max(0, pred)  # Ensure non-negative prices
+        if self.feature_pipeline is not None:
+            X_scaled = self.feature_pipeline.transform(flights)
+        else:
+            X_scaled = self._transform_dataframe(flights)
+        
+        # Spread over the forest's trees for the whole batch in one pass
+        confidence = 0.95
+        spread = self.tree_spread()
+        tree_stats = None
+        if spread is not None:
+            tree_stats = spread.summarize(X_scaled, ((1 - confidence) / 2, (1 + confidence) / 2))
+        
+        # Get predictions from all models, ensuring non-negative prices; the forest's
+        # prediction is its tree mean, so it is not evaluated a second time
+        model_outputs = {
+            name: np.maximum(0, tree_stats[0] if name == 'random_forest' and tree_stats is not None
+                             else model.predict(X_scaled))
+            for name, model in self.models.items()
+        }
         
-        # Ensemble prediction (average)
-        ensemble_pred = np.mean(list(predictions.values()))
+        results = []
+        for i in range(len(flights)):
+            predictions = {name: outputs[i] for name, outputs in model_outputs.items()}
+            
+            # Ensemble prediction (average)
+            ensemble_pred = np.mean(list(predictions.values()))
+            
+            row_stats = tuple(stat[i] for stat in tree_stats) if tree_stats is not None else None
+            results.append({
+                'predicted_price': ensemble_pred,
+                'model_predictions': predictions,
+                'confidence_interval': self._calculate_confidence_interval(predictions, row_stats, confidence)
+            })
         
-        return {
-            'predicted_price': ensemble_pred,
-            'model_predictions': predictions,
-            'confidence_interval': self._calculate_confidence_interval(predictions)
-        }
+        return results
+    
+    def tree_spread(self) -> Optional[TreeSpread]:
+        """Per-tree spread helper for the random forest member, if there is one"""
+        forest = self.models.get('random_forest')
+        if forest is None or not TreeSpread.supports(forest):
+            return None
+        if self._tree_spread is None or self._tree_spread.forest is not forest:
+            self._tree_spread = TreeSpread(forest)
+        return self._tree_spread
     
-    def _calculate_confidence_interval(self, predictions: Dict, confidence: float = 0.95) -> Dict:
-        """Calculate confidence interval for predictions"""
+    def _calculate_confidence_interval(
+        self,
+        predictions: Dict,
+        tree_stats: Optional[Tuple[float, float, float, float]] = None,
+        confidence: float = 0.95
+    ) -> Dict:
+        """
+        Calculate confidence interval for predictions.
+        
+        With the forest's per-tree (mean, std, lower, upper) the interval is the
+        tree quantile range, re-centred on the ensemble prediction; models
+        without a forest fall back to the spread between ensemble members.
+        """
         pred_values = list(predictions.values())
         mean_pred = np.mean(pred_values)
-        std_pred = np.std(pred_values)
         
-        z_score = 1.96  # 95% confidence
-        margin = z_score * std_pred
+        if tree_stats is not None:
+            tree_mean, std_pred, tree_lower, tree_upper = tree_stats
+            lower = mean_pred - (tree_mean - tree_lower)
+            upper = mean_pred + (tree_upper - tree_mean)
+        else:
+            std_pred = np.std(pred_values)
+            z_score = 1.96  # 95% confidence
+            margin = z_score * std_pred
+            lower = mean_pred - margin
+            upper = mean_pred + margin
         
         return {
-            'lower': max(0, mean_pred - margin),
-            'upper': mean_pred + margin,
+            'lower': max(0, lower),
+            'upper': upper,
+            'std': float(std_pred),
             'confidence': confidence
         }
     
-    def save_models(self):
-        """Save trained models to disk"""
-        model_path = os.path.join(self.model_cache_dir, 'price_prediction')
-        os.makedirs(model_path, exist_ok=True)
-        
-        # Save models
-        for name, model in self.models.items():
-            joblib.dump(model, os.path.join(model_path, f'{name}.pkl'))
+    def save_models(self, inherit_segments: bool = False) -> str:
+        """Publish the trained models as a new store version and make it current"""
+        
+        def write(path: str):
+            os.makedirs(os.path.join(path, 'models'))
+            for name, model in self.models.items():
+                joblib.dump(model, os.path.join(path, 'models', f'{name}.pkl'))
+            if self.segment_models:
+                os.makedirs(os.path.join(path, 'segments'))
+                for segment, model in self.segment_models.items():
+                    joblib.dump(model, os.path.join(path, 'segments', f'{segment}.pkl'))
+            
+            # Save scalers and encoders
+            joblib.dump(self.scalers, os.path.join(path, 'scalers.pkl'))
+            joblib.dump(self.encoders, os.path.join(path, 'encoders.pkl'))
+            self.category_index.save(os.path.join(path, 'category_index.pkl'))
+            joblib.dump(self.feature_columns, os.path.join(path, 'features.pkl'))
+            return {
+                'models': list(self.models),
+                'feature_columns': list(self.feature_columns),
+                'calendar_version': CALENDAR_VERSION
+            }
         
-        # Save scalers and encoders
-        joblib.dump(self.scalers, os.path.join(model_path, 'scalers.pkl'))
-        joblib.dump(self.encoders, os.path.join(model_path, 'encoders.pkl'))
-        joblib.dump(self.feature_columns, os.path.join(model_path, 'features.pkl'))
+        base_version = self.version if inherit_segments else None
+        self.version = self.store.publish(write, base_version=base_version, inherit=('segments/',))
+        self.store.prune(self.keep_versions)
         
-        logger.info(f"Models saved to {model_path}")
+        logger.info(f"Models saved to {self.store.version_path(self.version)}")
+        return self.version
     
-    def load_models(self):
-        """Load trained models from disk"""
-        model_path = os.path.join(self.model_cache_dir, 'price_prediction')
-        
-        if not os.path.exists(model_path):
-            logger.warning("No saved models found")
+    def load_models(
+        self,
+        hot_segments: Optional[List[str]] = None,
+        max_workers: int = 4,
+        version: Optional[str] = None,
+        mmap: bool = True
+    ):
+        """
+        Load one store version (the current one by default), reading files in
+        parallel, and prime the inference path. With mmap, numpy arrays inside
+        the pickles are memory-mapped read-only instead of copied into private memory.
+        """
+        version = version or self.store.current_version()
+        if version is not None:
+            model_path = self.store.version_path(version)
+            if not self.store.verify(version):
+                return False
+            manifest = self.store.read_manifest(version)
+            model_names = manifest['models']
+            models_dir = os.path.join(model_path, 'models')
+            # Versions saved before the calendar was versioned used definition 1
+            calendar_version = manifest.get('calendar_version', 1)
+        else:
+            # Directories written before the versioned store keep everything at the top level
+            model_path = self.store.root
+            if not os.path.exists(model_path):
+                logger.warning("No saved models found")
+                return False
+            support_files = ('scalers.pkl', 'encoders.pkl', 'features.pkl', 'category_index.pkl')
+            model_names = [
+                model_file[:-len('.pkl')] for model_file in os.listdir(model_path)
+                if model_file.endswith('.pkl') and model_file not in support_files
+            ]
+            models_dir = model_path
+            calendar_version = 1
+        
+        # Date features such as is_holiday_season would be skewed, so such models must be retrained
+        if calendar_version != CALENDAR_VERSION:
+            logger.error(
+                f"Refusing to load models in {model_path}: trained with calendar definition "
+                f"{calendar_version}, serving uses {CALENDAR_VERSION}; retrain them"
+            )
             return False
         
         try:
-            # Load models
-            for model_file in os.listdir(model_path):
-                if model_file.endswith('.pkl') and model_file != 'scalers.pkl' and model_file != 'encoders.pkl' and model_file != 'features.pkl':
-                    name = model_file.replace('.pkl', '')
-                    self.models[name] = joblib.load(os.path.join(model_path, model_file))
+            load = partial(joblib.load, mmap_mode='r' if mmap else None)
+            segment_files = {
+                segment: os.path.join(model_path, 'segments', f'{segment}.pkl')
+                for segment in (hot_segments or [])
+                if os.path.exists(os.path.join(model_path, 'segments', f'{segment}.pkl'))
+            }
+            
+            # Unpickling is mostly I/O and array allocation, so threads overlap well
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                model_futures = {
+                    name: pool.submit(load, os.path.join(models_dir, f'{name}.pkl')) for name in model_names
+                }
+                segment_futures = {name: pool.submit(load, path) for name, path in segment_files.items()}
+                scalers = pool.submit(load, os.path.join(model_path, 'scalers.pkl'))
+                encoders = pool.submit(load, os.path.join(model_path, 'encoders.pkl'))
+                features = pool.submit(load, os.path.join(model_path, 'features.pkl'))
+                
+                models = {name: future.result() for name, future in model_futures.items()}
+                segments = {name: future.result() for name, future in segment_futures.items()}
+                loaded_scalers, loaded_encoders = scalers.result(), encoders.result()
+                feature_columns = features.result()
             
-            # Load scalers and encoders
-            self.scalers = joblib.load(os.path.join(model_path, 'scalers.pkl'))
-            self.encoders = joblib.load(os.path.join(model_path, 'encoders.pkl'))
-            self.feature_columns = joblib.load(os.path.join(model_path, 'features.pkl'))
+            # Older model directories predate the persisted category index
+            index_path = os.path.join(model_path, 'category_index.pkl')
+            if os.path.exists(index_path):
+                category_index = CategoryIndex.load(index_path)
+            else:
+                category_index = CategoryIndex.from_encoders(loaded_encoders)
+            
+            # Nothing is assigned until every file loaded, so a failed load leaves the model unchanged
+            self.models = models
+            self.segment_models.update(segments)
+            self.scalers = loaded_scalers
+            self.encoders = loaded_encoders
+            self.feature_columns = feature_columns
+            self.category_index = category_index
+            self.version = version
+            self.compile_feature_pipeline()
+            self.warm_up()
             
             logger.info(f"Models loaded from {model_path}")
             return True
@@ -234,3 +597,30 @@ class PricePredictionModel:
         except Exception as e:
             logger.error(f"Error loading models: {e}")
             return False
+    
+    @classmethod
+    def live(cls, model_cache_dir: str = "./models", **load_kwargs) -> LiveModel:
+        """
+        Hot-swappable serving handle: each refresh loads the store's current
+        version into a new instance and swaps it in once it is loaded and warm.
+        """
+        def load(version: str) -> Optional['PricePredictionModel']:
+            model = cls(model_cache_dir)
+            return model if model.load_models(version=version, **load_kwargs) else None
+        
+        handle = LiveModel(ModelStore(os.path.join(model_cache_dir, 'price_prediction')), load)
+        handle.refresh()
+        return handle
+    
+    def warm_up(self, sample: Optional[Dict] = None):
+        """Run a throwaway prediction so the first real request skips lazy initialization"""
+        if sample is None:
+            sample = {
+                'airline': 'XX', 'origin': 'AAA', 'destination': 'BBB', 'cabin': 'economy',
+                'departure_date': (datetime.now() + timedelta(days=30)).isoformat(),
+                'duration': 120, 'stops': 0
+            }
+        try:
+            self.predict(sample)
+        except Exception as e:
+            logger.warning(f"Model warm-up prediction failed: {e}")
@@ -0,0 +1,82 @@
+import os
+import resource
+from typing import Callable, Iterator, Union
+
+import numpy as np
+import pandas as pd
+
+ChunkSource = Union[str, Callable[[], Iterator[pd.DataFrame]]]
+
+
+def iter_chunks(path: str, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or Parquet file as DataFrames of at most `chunksize` rows"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to stream Parquet training data") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def open_source(source: ChunkSource, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Start a fresh pass over a path or a chunk-iterator factory"""
+    if isinstance(source, str):
+        return iter_chunks(source, chunksize)
+    return source()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+class ReservoirSample:
+    """
+    Fixed-capacity uniform sample of streamed (X, y) rows (algorithm R,
+    applied a chunk at a time).
+    """
+
+    def __init__(self, capacity: int, n_features: int, random_state: int = 42):
+        self.capacity = capacity
+        self.X = np.empty((capacity, n_features), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.float64)
+        self.seen = 0
+        self._rng = np.random.default_rng(random_state)
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        n = len(X)
+        if n == 0:
+            return
+
+        # Fill the empty slots first
+        fill = max(0, min(n, self.capacity - self.seen))
+        if fill:
+            self.X[self.seen:self.seen + fill] = X[:fill]
+            self.y[self.seen:self.seen + fill] = y[:fill]
+
+        # Then keep each later row with probability capacity / (rows seen so far)
+        if fill < n:
+            positions = np.arange(self.seen + fill, self.seen + n)
+            slots = (self._rng.random(n - fill) * (positions + 1)).astype(np.int64)
+            keep = slots < self.capacity
+            self.X[slots[keep]] = X[fill:][keep]
+            self.y[slots[keep]] = y[fill:][keep]
+
+        self.seen += n
+
+    @property
+    def size(self) -> int:
+        return min(self.seen, self.capacity)
+
+    def arrays(self):
+        return self.X[:self.size], self.y[:self.size]
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.y.nbytes
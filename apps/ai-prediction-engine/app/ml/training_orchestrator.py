@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Optional, Tuple, Type
+
+import numpy as np
+from app.ml.metrics import regression_metrics
+from loguru import logger
+from sklearn.model_selection import train_test_split
+
+# (estimator class, constructor params) - picklable, so workers build their own instance
+EstimatorSpec = Tuple[Type, Dict[str, Any]]
+
+# Segments with fewer rows are fitted on all of them and not evaluated
+MIN_SEGMENT_EVAL_ROWS = 20
+
+
+class SharedArrays:
+    """
+    Arrays written once to .npy files and memory-mapped read-only by worker
+    processes, so the feature matrix lives once in the page cache instead of
+    being pickled to every worker.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = tempfile.mkdtemp(prefix='skyscout-train-', dir=directory)
+        self.paths: Dict[str, str] = {}
+
+    def put(self, name: str, array: np.ndarray) -> str:
+        path = os.path.join(self.directory, f'{name}.npy')
+        np.save(path, np.ascontiguousarray(array))
+        self.paths[name] = path
+        return path
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode='r')
+
+
+def _worker_count(tasks: int, max_workers: Optional[int]) -> int:
+    return max(1, min(tasks, max_workers or os.cpu_count() or 1))
+
+
+def _with_thread_budget(params: Dict[str, Any], workers: int) -> Dict[str, Any]:
+    """Split the cores between workers for estimators that use n_jobs"""
+    if 'n_jobs' not in params:
+        return params
+    return {**params, 'n_jobs': max(1, (os.cpu_count() or 1) // workers)}
+
+
+def _fit_member(name: str, spec: EstimatorSpec, paths: Dict[str, str]):
+    estimator_cls, params = spec
+    X_train, y_train = _open(paths['X_train']), _open(paths['y_train'])
+
+    started = time.perf_counter()
+    model = estimator_cls(**params).fit(X_train, y_train)
+    seconds = time.perf_counter() - started
+
+    metrics = {}
+    if 'X_test' in paths:
+        metrics = regression_metrics(_open(paths['y_test']), model.predict(_open(paths['X_test'])))
+    metrics['train_seconds'] = seconds
+    return name, model, metrics
+
+
+def _fit_segment(segment: str, spec: EstimatorSpec, paths: Dict[str, str], start: int, stop: int):
+    estimator_cls, params = spec
+    X, y = _open(paths['X'])[start:stop], _open(paths['y'])[start:stop]
+
+    started = time.perf_counter()
+    metrics = {'rows': stop - start}
+    if stop - start >= MIN_SEGMENT_EVAL_ROWS:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        model = estimator_cls(**params).fit(X_train, y_train)
+        metrics.update(regression_metrics(y_test, model.predict(X_test)))
+    else:
+        model = estimator_cls(**params).fit(X, y)
+    metrics['train_seconds'] = time.perf_counter() - started
+    return segment, model, metrics
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    # spawn: forking a process that already runs threads (loguru, uvicorn) can deadlock
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def fit_members_parallel(
+    members: Dict[str, EstimatorSpec],
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: Optional[np.ndarray] = None,
+    y_test: Optional[np.ndarray] = None,
+    max_workers: Optional[int] = None
+) -> Tuple[Dict[str, Any], Dict[str, Dict]]:
+    """Fit ensemble members concurrently on one shared feature matrix"""
+    workers = _worker_count(len(members), max_workers)
+
+    with SharedArrays() as shared:
+        # float32 matches the tree learners' internal dtype, so fitting does not copy
+        shared.put('X_train', np.asarray(X_train, dtype=np.float32))
+        shared.put('y_train', np.asarray(y_train, dtype=np.float64))
+        if X_test is not None:
+            shared.put('X_test', np.asarray(X_test, dtype=np.float32))
+            shared.put('y_test', np.asarray(y_test, dtype=np.float64))
+
+        fitted, results = {}, {}
+        with _executor(workers) as pool:
+            futures = [
+                pool.submit(_fit_member, name, (cls, _with_thread_budget(params, workers)), shared.paths)
+                for name, (cls, params) in members.items()
+            ]
+            for future in as_completed(futures):
+                name, model, metrics = future.result()
+                fitted[name] = model
+                results[name] = metrics
+                logger.info(f"Trained {name} in {metrics['train_seconds']:.1f}s")
+
+    # Keep the caller's member order
+    return {name: fitted[name] for name in members}, {name: results[name] for name in members}
+
+
+def fit_segments_parallel(
+    spec: EstimatorSpec,
+    X: np.ndarray,
+    y: np.ndarray,
+    segments: np.ndarray,
+    max_workers: Optional[int] = None
+) -> Tuple[Dict[str, Any], Dict[str, Dict]]:
+    """Fit one model per segment (e.g. route) across a process pool"""
+    segments = np.asarray(segments).astype(str)
+    order = np.argsort(segments, kind='stable')
+    sorted_segments = segments[order]
+    names, starts = np.unique(sorted_segments, return_index=True)
+    stops = np.append(starts[1:], len(sorted_segments))
+    workers = _worker_count(len(names), max_workers)
+    cls, params = spec
+
+    with SharedArrays() as shared:
+        # Rows sorted by segment, so each task only needs its slice bounds
+        shared.put('X', np.asarray(X, dtype=np.float32)[order])
+        shared.put('y', np.asarray(y, dtype=np.float64)[order])
+
+        fitted, results = {}, {}
+        with _executor(workers) as pool:
+            futures = [
+                pool.submit(
+                    _fit_segment, str(name), (cls, _with_thread_budget(params, workers)),
+                    shared.paths, int(start), int(stop)
+                )
+                for name, start, stop in zip(names, starts, stops)
+            ]
+            for future in as_completed(futures):
+                segment, model, metrics = future.result()
+                fitted[segment] = model
+                results[segment] = metrics
+
+    logger.info(f"Trained {len(fitted)} segment models with {workers} workers")
+    return fitted, results
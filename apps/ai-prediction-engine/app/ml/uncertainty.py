@@ -0,0 +1,45 @@
+from typing import Any, Tuple
+
+import numpy as np
+
+
+class TreeSpread:
+    """
+    Per-tree predictions of a fitted sklearn forest regressor.
+
+    Leaf values of all trees are packed once into a (n_trees, max_nodes)
+    table; a batch is then routed with the forest's own `apply` (one call,
+    shape (n_samples, n_trees)) and every tree's output is gathered with a
+    single fancy index instead of calling predict on each estimator.
+    """
+
+    def __init__(self, forest: Any):
+        self.forest = forest
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        self.leaf_values = np.zeros((len(trees), max(tree.node_count for tree in trees)))
+        for i, tree in enumerate(trees):
+            self.leaf_values[i, :tree.node_count] = tree.value[:, 0, 0]
+        self._tree_index = np.arange(len(trees))
+
+    @staticmethod
+    def supports(model: Any) -> bool:
+        """True for fitted single-output forests of regression trees (not boosted stages)"""
+        estimators = getattr(model, 'estimators_', None)
+        if not isinstance(estimators, list) or not estimators or not hasattr(model, 'apply'):
+            return False
+        return all(
+            hasattr(estimator, 'tree_') and estimator.tree_.value.shape[1:] == (1, 1)
+            for estimator in estimators
+        )
+
+    def predict_trees(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree predictions, shape (n_samples, n_trees)"""
+        return self.leaf_values[self._tree_index, self.forest.apply(X)]
+
+    def summarize(
+        self, X: np.ndarray, quantiles: Tuple[float, float] = (0.025, 0.975)
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Mean, std and lower/upper quantiles over the trees for each row of X"""
+        per_tree = self.predict_trees(X)
+        lower, upper = np.quantile(per_tree, quantiles, axis=1)
+        return per_tree.mean(axis=1), per_tree.std(axis=1), lower, upper
@@ -1,16 +1,31 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
 from app.api.routes import analytics, models, predictions
 from app.core.config import settings
 from app.core.database import Base, engine
+from app.core.readiness import WarmupState
 from app.ml.model_manager import ModelManager
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 # Initialize model manager
 model_manager = ModelManager()
+warmup_state = WarmupState()
+
+async def warm_up_models():
+    """Load ML models off the startup path; /ready reports when they are resident"""
+    warmup_state.start()
+    try:
+        await model_manager.load_models(hot_segments=settings.HOT_SEGMENTS)
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+        warmup_state.finish(error=str(e))
+        return
+    warmup_state.finish()
+    logger.info(f"✅ Models warm after {warmup_state.snapshot()['elapsed_seconds']}s")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -22,18 +37,20 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    # Load ML models
-    await model_manager.load_models()
+    # Load ML models in the background so the process answers probes meanwhile
+    warmup_task = asyncio.create_task(warm_up_models())
     
     # Store model manager in app state
     app.state.model_manager = model_manager
+    app.state.warmup = warmup_state
     
-    logger.info("✅ AI Prediction Engine ready")
+    logger.info("✅ AI Prediction Engine started, warming up models")
     
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down AI Prediction Engine")
+    warmup_task.cancel()
 
 app = FastAPI(
     title="SkyScout AI Prediction Engine",
@@ -68,6 +85,13 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "ai-prediction-engine"}
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """503 until models are loaded and primed"""
+    if not warmup_state.ready:
+        response.status_code = 503
+    return warmup_state.snapshot()
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
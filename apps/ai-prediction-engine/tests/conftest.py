@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Imports resolve as app.ml.* from the service root, like main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+import os
+from datetime import datetime, timedelta
+
+from app.ml.model_store import MANIFEST_FILE, VERSION_TIME_FORMAT, ModelStore
+
+
+def write_model(payload: str):
+    def write(path: str):
+        with open(os.path.join(path, 'model.pkl'), 'w') as f:
+            f.write(payload)
+    return write
+
+
+def test_versions_published_in_quick_succession_stay_ordered(tmp_path):
+    store = ModelStore(str(tmp_path))
+    published = [store.publish(write_model(str(i))) for i in range(5)]
+
+    assert len(set(published)) == len(published)
+    assert store.list_versions() == published
+    assert store.current_version() == published[-1]
+
+    store.prune(keep=2)
+    assert store.list_versions() == published[-2:]
+
+
+def test_version_sorts_after_a_newer_clock_and_legacy_ids(tmp_path):
+    store = ModelStore(str(tmp_path))
+    # A whole-second id from before, then one stamped ahead of this clock
+    legacy = '20200101T000000-abcdef'
+    ahead = f"{(datetime.utcnow() + timedelta(hours=1)).strftime(VERSION_TIME_FORMAT)}-abcdef"
+    for version in (legacy, ahead):
+        os.makedirs(store.version_path(version))
+        with open(os.path.join(store.version_path(version), MANIFEST_FILE), 'w') as f:
+            f.write('{"files": {}}')
+
+    version = store.publish(write_model('new'))
+    assert store.list_versions() == [legacy, ahead, version]
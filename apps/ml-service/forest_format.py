@@ -0,0 +1,236 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+# Binary layout:
+#   magic (4s) | version (H) | flags (H) | meta length (I) | meta JSON | payload
+# The payload is the node arrays back to back, each aligned to 8 bytes, and is
+# zlib-compressed when FLAG_ZLIB is set.
+MAGIC = b"SKYF"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x1
+HEADER = struct.Struct("<4sHHI")
+
+ARRAY_DTYPES = {
+    "tree_roots": np.int32,
+    "feature": np.int32,
+    "threshold": np.float64,
+    "children_left": np.int32,
+    "children_right": np.int32,
+    "value": np.float64,
+}
+
+
+class FlatForest:
+    """
+    Tree ensemble stored as contiguous node arrays.
+
+    All trees share one node index space; `tree_roots` holds the root node of
+    each tree. Leaves point to themselves, so prediction walks every tree in
+    lock step for `max_depth` steps without per-node branching.
+    """
+
+    def __init__(
+        self,
+        tree_roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        value: np.ndarray,
+        n_features: int,
+        max_depth: int,
+        version: Optional[str] = None,
+        trained_at: Optional[float] = None,
+    ):
+        self.tree_roots = tree_roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self.version = version
+        # Unix time the source model was fitted; drives background refresh
+        self.trained_at = trained_at
+        # Arrays map pages shared with other worker processes (see model_arena)
+        self.shared = False
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, name).nbytes for name in ARRAY_DTYPES))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Return the leaf node reached in every tree, shape (n_samples, n_trees)"""
+        # Match sklearn's split semantics: inputs are compared as float32
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features}")
+
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.tree_roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_trees(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree predictions, shape (n_samples, n_trees)"""
+        return self.value[self.apply(X)]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Forest prediction (mean over trees), compatible with sklearn's predict"""
+        return self.predict_trees(X).mean(axis=1)
+
+
+def flatten_forest(model: Any, version: Optional[str] = None, trained_at: Optional[float] = None) -> FlatForest:
+    """Convert a fitted single-output sklearn forest regressor to a FlatForest"""
+    if isinstance(model, FlatForest):
+        return model
+
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None:
+        raise ValueError(f"{type(model).__name__} is not a fitted tree ensemble")
+
+    trees = [estimator.tree_ for estimator in estimators]
+    if any(tree.value.shape[1] != 1 or tree.value.shape[2] != 1 for tree in trees):
+        raise ValueError("Only single-output regression forests can be flattened")
+
+    counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    feature = []
+    threshold = []
+    children_left = []
+    children_right = []
+    for tree, offset in zip(trees, offsets):
+        node_ids = np.arange(tree.node_count) + offset
+        is_leaf = tree.children_left == -1
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        children_left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+        children_right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+
+    return FlatForest(
+        tree_roots=offsets.astype(np.int32),
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        children_left=np.concatenate(children_left).astype(np.int32),
+        children_right=np.concatenate(children_right).astype(np.int32),
+        value=np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64),
+        n_features=int(model.n_features_in_),
+        max_depth=max(int(tree.max_depth) for tree in trees),
+        version=version,
+        trained_at=trained_at,
+    )
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def serialize_forest(forest: FlatForest, compress: bool = False, level: int = 6) -> bytes:
+    """Encode a FlatForest in the versioned binary format"""
+    arrays = []
+    layout = {}
+    offset = 0
+    for name, dtype in ARRAY_DTYPES.items():
+        array = np.ascontiguousarray(getattr(forest, name), dtype=dtype)
+        offset = _align(offset)
+        layout[name] = {"offset": offset, "count": int(array.size)}
+        arrays.append((offset, array))
+        offset += array.nbytes
+
+    payload = bytearray(_align(offset))
+    for start, array in arrays:
+        payload[start:start + array.nbytes] = array.tobytes()
+
+    meta = json.dumps({
+        "n_features": forest.n_features,
+        "max_depth": forest.max_depth,
+        "version": forest.version,
+        "trained_at": forest.trained_at,
+        "arrays": layout,
+    }).encode()
+
+    flags = 0
+    body = bytes(payload)
+    if compress:
+        flags |= FLAG_ZLIB
+        body = zlib.compress(body, level)
+
+    # Pad the metadata so the uncompressed payload starts 8-byte aligned
+    meta += b" " * (_align(HEADER.size + len(meta)) - HEADER.size - len(meta))
+    return HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(meta)) + meta + body
+
+
+def read_header(buffer: Union[bytes, memoryview]) -> Tuple[int, int, Dict[str, Any], int]:
+    """Return (version, flags, meta, payload offset), validating magic and version"""
+    if len(buffer) < HEADER.size:
+        raise ValueError("Buffer too small for a forest header")
+    magic, version, flags, meta_len = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a serialized forest (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported forest format version {version}")
+    meta_end = HEADER.size + meta_len
+    meta = json.loads(bytes(buffer[HEADER.size:meta_end]))
+    return version, flags, meta, meta_end
+
+
+def deserialize_forest(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> FlatForest:
+    """
+    Decode a serialized forest.
+
+    Uncompressed payloads are not copied: the node arrays are read-only
+    views over `buffer`, so the buffer must outlive the returned forest.
+    """
+    view = memoryview(buffer)
+    _, flags, meta, payload_offset = read_header(view)
+    payload = view[payload_offset:]
+    if flags & FLAG_ZLIB:
+        payload = memoryview(zlib.decompress(payload))
+
+    arrays = {
+        name: np.frombuffer(payload, dtype=dtype, count=meta["arrays"][name]["count"],
+                            offset=meta["arrays"][name]["offset"])
+        for name, dtype in ARRAY_DTYPES.items()
+    }
+    return FlatForest(
+        n_features=meta["n_features"],
+        max_depth=meta["max_depth"],
+        version=meta.get("version"),
+        trained_at=meta.get("trained_at"),
+        **arrays
+    )
+
+
+def write_forest(path: str, forest: FlatForest, compress: bool = False):
+    """Write a forest file atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(serialize_forest(forest, compress=compress))
+    os.replace(tmp_path, path)
+
+
+def load_forest(path: str) -> FlatForest:
+    """Memory-map a forest file; uncompressed arrays are paged in on demand"""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return deserialize_forest(mapped)
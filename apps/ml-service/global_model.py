@@ -0,0 +1,100 @@
+import sys
+import threading
+from typing import Any, Dict
+
+import numpy as np
+
+
+class RouteCalibration:
+    """
+    Additive per-route price offsets on top of a shared model.
+
+    A route's offset is the mean residual of the shared model on the route's
+    own observations, shrunk toward zero by `prior_rows` pseudo-observations:
+    routes with little data stay close to the shared prediction and unseen
+    routes get no offset at all.
+    """
+
+    def __init__(self, prior_rows: float = 50.0):
+        self.prior_rows = prior_rows
+        self._offsets: Dict[str, float] = {}
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def fit(self, route: str, residuals: np.ndarray) -> float:
+        offset = float(np.sum(residuals) / (len(residuals) + self.prior_rows))
+        self.set(route, offset, len(residuals))
+        return offset
+
+    def set(self, route: str, offset: float, rows: int):
+        with self._lock:
+            self._offsets[route] = offset
+            self._rows[route] = rows
+
+    def offset(self, route: str) -> float:
+        return self._offsets.get(route, 0.0)
+
+    def __contains__(self, route: str) -> bool:
+        return route in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the offset tables"""
+        entries = sum(sys.getsizeof(route) + 2 * 32 for route in self._offsets)
+        return sys.getsizeof(self._offsets) + sys.getsizeof(self._rows) + entries
+
+
+class CalibratedRouteModel:
+    """Route view of the shared forest: its predictions shifted by the route's offset"""
+
+    __slots__ = ("forest", "offset", "version", "trained_at", "shared")
+
+    def __init__(self, forest: Any, offset: float):
+        self.forest = forest
+        self.offset = offset
+        # Distinct per offset, so result and timing caches never mix calibrations
+        self.version = f"{forest.version}:{offset:.4f}"
+        self.trained_at = getattr(forest, "trained_at", None)
+        self.shared = True
+
+    def predict_trees(self, X: np.ndarray) -> np.ndarray:
+        return self.forest.predict_trees(X) + self.offset
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.forest.predict(X) + self.offset
+
+
+class GlobalPriceModel:
+    """
+    One forest serving every route, plus per-route calibration.
+
+    Memory and training time no longer grow with the route count: a new
+    route costs one offset fitted from its history (a single predict over
+    its rows) and is served from the shared forest until then.
+    """
+
+    def __init__(self, forest: Any, prior_rows: float = 50.0):
+        self.forest = forest
+        self.calibration = RouteCalibration(prior_rows)
+
+    def for_route(self, route: str) -> CalibratedRouteModel:
+        return CalibratedRouteModel(self.forest, self.calibration.offset(route))
+
+    def calibrate(self, route: str, X: np.ndarray, y: np.ndarray) -> float:
+        """Fit the route's offset from its observed prices; blocking"""
+        return self.calibration.fit(route, np.asarray(y) - self.forest.predict(X))
+
+    @property
+    def nbytes(self) -> int:
+        return int(getattr(self.forest, "nbytes", 0)) + self.calibration.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "forest_version": self.forest.version,
+            "calibrated_routes": len(self.calibration),
+            "forest_bytes": int(getattr(self.forest, "nbytes", 0)),
+            "calibration_bytes": self.calibration.nbytes
+        }
@@ -0,0 +1,254 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from calendar_table import HOLIDAY_MONTHS
+from price_features import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+TABLE_SUFFIX = ".table.npy"
+
+# Grid rows evaluated per predict call while building, bounding the per-tree output matrix
+BUILD_CHUNK_ROWS = 16384
+
+# Feature matrix columns of the independent grid axes; the weekend and holiday
+# flags are derived from the weekday and month axes
+DAYS_AHEAD, DAY_OF_WEEK, MONTH, PASSENGERS, CABIN, HISTORY = 0, 1, 2, 5, 6, 7
+
+
+def _axis_columns(column: int, values: np.ndarray) -> Dict[int, np.ndarray]:
+    """Feature columns determined by one axis value"""
+    if column == DAY_OF_WEEK:
+        return {DAY_OF_WEEK: values, 3: (values >= 5).astype(np.int64)}
+    if column == MONTH:
+        return {MONTH: values, 4: np.isin(values, HOLIDAY_MONTHS).astype(np.int64)}
+    return {column: values}
+
+
+class SpreadTable:
+    """
+    A route forest materialized over the discrete feature grid.
+
+    Each axis is collapsed to the bins the forest can tell apart (values on
+    the same side of every split threshold of the features the axis feeds),
+    so the table holds one (mean, std, lower, upper) row per distinguishable
+    combination instead of per raw combination. Lookup maps every axis
+    through its bins in one gather and reads the table rows in another.
+    """
+
+    def __init__(self, version: str, axes: List[Tuple[int, int, np.ndarray]], values: np.ndarray):
+        self.version = version
+        # (column, smallest value, value -> bin map) per axis
+        self.axes = axes
+        self.shape = tuple(int(bins.max()) + 1 for _, _, bins in axes)
+        self.values = values
+        self._flat = values.reshape(-1, values.shape[-1])
+
+        # All axis maps in one array, so lookup is a single gather and a dot product
+        self._columns = np.array([column for column, _, _ in axes], dtype=np.intp)
+        self._lows = np.array([low for _, low, _ in axes], dtype=np.int64)
+        self._sizes = np.array([len(bins) for _, _, bins in axes], dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(self._sizes)[:-1]))
+        self._bins = np.concatenate([bins for _, _, bins in axes]).astype(np.intp)
+        self._strides = np.array(
+            [int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))], dtype=np.intp
+        )
+
+    @staticmethod
+    def plan(forest: Any, max_days: int, max_history: int) -> Tuple[List[Tuple[int, int, np.ndarray]], List[np.ndarray]]:
+        """Per-axis bin maps and one representative value per bin, from the forest's split thresholds"""
+        split = np.isfinite(forest.threshold)
+        thresholds = {
+            column: np.unique(forest.threshold[split & (forest.feature == column)])
+            for column in range(len(FEATURE_COLUMNS))
+        }
+        ranges = [
+            (DAYS_AHEAD, 0, max_days), (DAY_OF_WEEK, 0, 6), (MONTH, 1, 12),
+            (PASSENGERS, 1, 9), (CABIN, 0, 3), (HISTORY, 0, max_history)
+        ]
+
+        axes = []
+        representatives = []
+        for column, low, high in ranges:
+            values = np.arange(low, high + 1, dtype=np.int64)
+            columns = _axis_columns(column, values)
+            # Forest inputs are compared as float32; x <= threshold goes left
+            signature = np.column_stack([
+                np.searchsorted(thresholds[c], columns[c].astype(np.float32), side="left") for c in columns
+            ])
+            _, first, bins = np.unique(signature, axis=0, return_index=True, return_inverse=True)
+            order = np.argsort(first)
+            remap = np.empty_like(order)
+            remap[order] = np.arange(len(order))
+            axes.append((column, low, remap[bins.reshape(-1)]))
+            representatives.append(values[np.sort(first)])
+        return axes, representatives
+
+    @classmethod
+    def build(
+        cls,
+        forest: Any,
+        predict: Callable[[Any, np.ndarray], np.ndarray],
+        axes: List[Tuple[int, int, np.ndarray]],
+        representatives: List[np.ndarray]
+    ) -> "SpreadTable":
+        grids = np.meshgrid(*representatives, indexing="ij")
+        X = np.zeros((grids[0].size, len(FEATURE_COLUMNS)), dtype=np.int64)
+        for (column, _, _), grid in zip(axes, grids):
+            for c, values in _axis_columns(column, grid.reshape(-1)).items():
+                X[:, c] = values
+        values = None
+        for start in range(0, len(X), BUILD_CHUNK_ROWS):
+            chunk = predict(forest, X[start:start + BUILD_CHUNK_ROWS])
+            if values is None:
+                values = np.empty((len(X), chunk.shape[1]), dtype=np.float32)
+            values[start:start + len(chunk)] = chunk
+        return cls(forest.version, axes, values.reshape(*[len(r) for r in representatives], values.shape[-1]))
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes)
+
+    def lookup(self, X: np.ndarray, offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Spread rows for X and a mask of rows inside the grid; rows outside
+        (e.g. bookings more than max_days ahead) are NaN for the caller to
+        answer from the forest. `offset` shifts the price columns (route
+        calibration on a shared forest).
+        """
+        position = X[:, self._columns] - self._lows
+        inside = ((position >= 0) & (position < self._sizes)).all(axis=1)
+        np.clip(position, 0, self._sizes - 1, out=position)
+        index = self._bins[position + self._offsets] @ self._strides
+
+        predicted = self._flat[index].astype(np.float64)
+        if not inside.all():
+            predicted[~inside] = np.nan
+        if offset:
+            predicted[:, [0, 2, 3]] += offset
+        return predicted, inside
+
+
+class LookupTableCache:
+    """
+    Spread tables by forest version, built once per version and kept as
+    .npy files under `directory` that every worker memory-maps. A retrained
+    model has a new version, so it gets a new table; files beyond
+    `max_entries` are removed oldest first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        predict: Callable[[Any, np.ndarray], np.ndarray],
+        max_entries: int = 256,
+        max_cells: int = 1 << 21,
+        max_days: int = 365,
+        max_history: int = 0,
+        mmap: bool = True
+    ):
+        self.directory = directory
+        self.predict = predict
+        self.max_entries = max_entries
+        self.max_cells = max_cells
+        self.max_days = max_days
+        self.max_history = max_history
+        self.mmap = mmap
+        # Version -> table, or None for forests whose grid exceeds max_cells
+        self._tables: "OrderedDict[str, Optional[SpreadTable]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.built = 0
+        self.loaded = 0
+        self.oversized = 0
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.directory, f"{version}{TABLE_SUFFIX}")
+
+    def get(self, version: str) -> Optional[SpreadTable]:
+        table = self._tables.get(version)
+        if table is not None:
+            self._tables.move_to_end(version)
+        return table
+
+    def known(self, version: str) -> bool:
+        """True once a version has a table or was found too large for one"""
+        return version in self._tables
+
+    def load_or_build(self, forest: Any) -> Optional[SpreadTable]:
+        """Map the forest's table from disk or build and write it; blocking"""
+        version = forest.version
+        axes, representatives = SpreadTable.plan(forest, self.max_days, self.max_history)
+        cells = int(np.prod([len(r) for r in representatives]))
+        if cells > self.max_cells:
+            logger.warning(f"Forest {version} needs {cells} table cells (limit {self.max_cells}); serving from the forest")
+            self.oversized += 1
+            self._remember(version, None)
+            return None
+
+        table = None
+        path = self.path(version)
+        if os.path.exists(path):
+            try:
+                values = np.load(path, mmap_mode="r" if self.mmap else None)
+                if values.shape[:-1] == tuple(len(r) for r in representatives):
+                    table = SpreadTable(version, axes, values)
+                    self.loaded += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Rebuilding unreadable table {path}: {e}")
+
+        if table is None:
+            table = SpreadTable.build(forest, self.predict, axes, representatives)
+            self.built += 1
+            try:
+                self._write(path, table.values)
+                if self.mmap:
+                    table = SpreadTable(version, axes, np.load(path, mmap_mode="r"))
+            except OSError as e:
+                logger.warning(f"Keeping table {version} in process memory: {e}")
+
+        self._remember(version, table)
+        return table
+
+    def _write(self, path: str, values: np.ndarray):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, values)
+        os.replace(tmp_path, path)
+        self._prune()
+
+    def _prune(self):
+        files = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(TABLE_SUFFIX)),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in files[:max(0, len(files) - self.max_entries)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, version: str, table: Optional[SpreadTable]):
+        with self._lock:
+            self._tables[version] = table
+            self._tables.move_to_end(version)
+            while len(self._tables) > self.max_entries:
+                self._tables.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        tables = [table for table in self._tables.values() if table is not None]
+        return {
+            "directory": self.directory,
+            "tables": len(tables),
+            "bytes": sum(table.nbytes for table in tables),
+            "max_cells": self.max_cells,
+            "grid": {"max_days": self.max_days, "max_history": self.max_history},
+            "built": self.built,
+            "loaded": self.loaded,
+            "oversized": self.oversized
+        }
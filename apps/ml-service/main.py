@@ -2,18 +2,46 @@ import asyncio
 import json
 import logging
 import os
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import joblib
 import numpy as np
-import pandas as pd
-import redis
-from fastapi import Depends, FastAPI, HTTPException
+from calendar_table import CALENDAR
+from fastapi import Depends, FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
+from forest_format import deserialize_forest, flatten_forest, load_forest, serialize_forest, write_forest
+from global_model import GlobalPriceModel
+from lookup_table import LookupTableCache
+from metrics import (
+    CONTENT_TYPE_LATEST,
+    MODEL_LOOKUPS,
+    MULTIPROC_DIR,
+    RETRAINS,
+    TRAINING_SECONDS,
+    RequestMetricsMiddleware,
+    RouteBuckets,
+    StageTimer,
+    observe_microbatch,
+    observe_redis,
+    publish_cache_stats,
+    register_cache_stats,
+    render_latest,
+)
+from microbatch import MicroBatcher
+from model_arena import ModelArena
+from model_cache import ModelCache
+from price_features import CABIN_ENCODING, price_feature_matrix
+from pydantic import BaseModel, Field, field_validator
+from redis_tier import CircuitBreaker, RedisTier
+from result_cache import PredictionResultCache
+from retraining import RetrainScheduler
+from timing import TimingEngine
+from uncertainty import SPREAD_COLUMNS, predict_with_spread, spread_confidence
+from warmup import RouteTraffic, WarmupProgress
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -34,41 +62,209 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Redis client for caching
-redis_client = redis.Redis.from_url(
+# Request latency per endpoint template, recorded outside CORS handling
+app.add_middleware(RequestMetricsMiddleware)
+
+# Redis client for caching (async, pooled, guarded by a circuit breaker)
+redis_client = RedisTier(
     os.getenv("REDIS_URL", "redis://localhost:6379"),
-    decode_responses=True
+    max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "20")),
+    socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25")),
+    connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.25")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("REDIS_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "30"))
+    ),
+    on_call=observe_redis
 )
 
-# Models storage
-models = {}
+# Models storage: bounded in-process tier, spilling evicted models to disk
+MODEL_CACHE_MAX_BYTES = int(os.getenv("ML_MODEL_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+MODEL_STORE_DIR = os.getenv("ML_MODEL_DIR", "./models")
+MODEL_COMPRESSION = os.getenv("ML_MODEL_COMPRESSION", "false").lower() == "true"
+
+def spill_model(model_key: str, model):
+    """Persist an evicted model to the disk tier off the event loop"""
+    if model_arena is not None:
+        model_arena.forget(model_key)
+    try:
+        asyncio.get_running_loop().run_in_executor(None, save_model_to_disk, model_key, model)
+    except RuntimeError:
+        save_model_to_disk(model_key, model)
+
+models = ModelCache(MODEL_CACHE_MAX_BYTES, on_evict=spill_model)
 scalers = {}
 
+# Shared model arena: forests every uvicorn worker on the node maps read-only from tmpfs
+# (ML_MODEL_ARENA_DIR= disables it); each worker charges its mappings to MODEL_CACHE_MAX_BYTES
+MODEL_ARENA_DIR = os.getenv("ML_MODEL_ARENA_DIR", "/dev/shm/skyscout-models")
+MODEL_ARENA_MAX_BYTES = int(os.getenv("ML_MODEL_ARENA_MAX_BYTES", str(256 * 1024 * 1024)))
+ARENA_SYNC_SECONDS = float(os.getenv("ML_ARENA_SYNC_SECONDS", "5"))
+model_arena = None
+if MODEL_ARENA_DIR:
+    try:
+        model_arena = ModelArena(MODEL_ARENA_DIR, MODEL_ARENA_MAX_BYTES)
+    except OSError as e:
+        logger.warning(f"Shared model arena disabled: {e}")
+
+# Prediction result cache: in-process LRU with TTL in front of Redis, one spread row per feature row
+result_cache = PredictionResultCache(
+    max_entries=int(os.getenv("ML_RESULT_CACHE_SIZE", "100000")),
+    ttl=int(os.getenv("ML_RESULT_CACHE_TTL", "300")),
+    redis_tier=redis_client if os.getenv("ML_RESULT_CACHE_REDIS", "true").lower() == "true" else None,
+    width=len(SPREAD_COLUMNS)
+)
+register_cache_stats(models, result_cache)
+
+# Route model training runs off the event loop; one in-flight task per route
+TRAINING_WORKERS = int(os.getenv("ML_TRAINING_WORKERS", "2"))
+COLD_ROUTE_FALLBACK = os.getenv("ML_COLD_ROUTE_FALLBACK", "false").lower() == "true"
+training_executor = ThreadPoolExecutor(max_workers=TRAINING_WORKERS, thread_name_prefix="model-training")
+training_tasks: Dict[str, asyncio.Task] = {}
+fallback_model = None
+
+# Background refresh of stale resident models (MODEL_UPDATE_INTERVAL=0 disables it)
+MODEL_UPDATE_INTERVAL = int(os.getenv("MODEL_UPDATE_INTERVAL", "3600"))
+# Keep Redis copies alive across refresh cycles so reloads never fall through to inline training
+MODEL_REDIS_TTL = int(os.getenv("ML_MODEL_REDIS_TTL", str(max(3600, 2 * MODEL_UPDATE_INTERVAL))))
+RETRAIN_CHECK_SECONDS = float(os.getenv("ML_RETRAIN_CHECK_SECONDS", "60"))
+RETRAIN_CONCURRENCY = int(os.getenv("ML_RETRAIN_CONCURRENCY", "1"))
+RETRAIN_BATCH_SIZE = int(os.getenv("ML_RETRAIN_BATCH_SIZE", "16"))
+RETRAIN_MAX_DRIFT = float(os.getenv("ML_RETRAIN_MAX_DRIFT", "0.5"))
+
+# Serving mode: "route" fits one forest per origin-destination pair; "global" serves every
+# route from one shared forest (cached, refreshed and shared like a route named "global")
+# plus per-route calibration offsets
+MODEL_MODE = os.getenv("ML_MODEL_MODE", "route")
+GLOBAL_MODEL_ROUTE = "global"
+ROUTE_TRAINING_ROWS = 1000
+GLOBAL_TRAINING_ROWS = int(os.getenv("ML_GLOBAL_TRAINING_ROWS", "20000"))
+CALIBRATION_PRIOR_ROWS = float(os.getenv("ML_CALIBRATION_PRIOR_ROWS", "50"))
+global_model: Optional[GlobalPriceModel] = None
+# In-flight calibrations by (forest version, route); a replaced forest's tasks
+# finish against the model they were started for and never block the new one
+calibration_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+# Startup warm-up: configured hot routes plus the busiest recent routes
+HOT_ROUTES = [route.strip() for route in os.getenv("ML_HOT_ROUTES", "").split(",") if route.strip()]
+WARMUP_TOP_N = int(os.getenv("ML_WARMUP_TOP_N", "0"))
+WARMUP_CONCURRENCY = int(os.getenv("ML_WARMUP_CONCURRENCY", "4"))
+# Routes reported by name in metrics labels (the rest share "other")
+route_bucket = RouteBuckets(
+    HOT_ROUTES + [route.strip() for route in os.getenv("ML_METRICS_ROUTES", "").split(",") if route.strip()]
+)
+# With several workers (PROMETHEUS_MULTIPROC_DIR set), how often each one publishes its cache stats
+METRICS_PUBLISH_SECONDS = float(os.getenv("ML_METRICS_PUBLISH_SECONDS", "5"))
+route_traffic = RouteTraffic(redis_client, flush_interval=float(os.getenv("ML_TRAFFIC_FLUSH_SECONDS", "30")))
+warmup_progress = WarmupProgress()
+background_tasks = set()
+
+# Batch prediction limits
+MAX_BATCH_SIZE = int(os.getenv("ML_MAX_BATCH_SIZE", "1000"))
+
+# Bulk demand forecasts are computed per route in date chunks of at least a month
+# and written to the stream whenever ML_FORECAST_FLUSH_BYTES of lines are pending
+MAX_FORECAST_ROUTES = int(os.getenv("ML_MAX_FORECAST_ROUTES", "10000"))
+FORECAST_CHUNK_DAYS = max(31, int(os.getenv("ML_FORECAST_CHUNK_DAYS", "366")))
+FORECAST_FLUSH_BYTES = int(os.getenv("ML_FORECAST_FLUSH_BYTES", "65536"))
+
+def compute_spread(model, features: np.ndarray) -> np.ndarray:
+    started = time.perf_counter()
+    computed = predict_with_spread(model, features)
+    result_cache.record_compute(time.perf_counter() - started, len(features))
+    return computed
+
+# Concurrent /predict/price calls for a route share one model call; ML_MICROBATCH_WAIT_MS
+# bounds the wait under concurrency (0 coalesces only requests ready in the same loop turn)
+micro_batcher = MicroBatcher(
+    compute_spread,
+    max_wait=float(os.getenv("ML_MICROBATCH_WAIT_MS", "2")) / 1000,
+    max_batch=int(os.getenv("ML_MICROBATCH_MAX_ROWS", "256")),
+    on_flush=observe_microbatch
+)
+
+# Inference mode: "forest" walks the trees for every cache miss; "table" answers rows inside
+# the discrete feature grid from the route forest materialized once per model version.
+# A forest that splits on every booking day needs about 1.1M cells (17MB) without the
+# price-history axis, so by default requests carrying history use the forest
+INFERENCE_MODE = os.getenv("ML_INFERENCE_MODE", "forest")
+lookup_tables = LookupTableCache(
+    os.path.join(MODEL_ARENA_DIR or MODEL_STORE_DIR, "tables"),
+    predict_with_spread,
+    max_entries=int(os.getenv("ML_TABLE_CACHE_SIZE", "256")),
+    max_cells=int(os.getenv("ML_TABLE_MAX_CELLS", str(1 << 21))),
+    max_days=int(os.getenv("ML_TABLE_MAX_DAYS", "365")),
+    max_history=int(os.getenv("ML_TABLE_MAX_HISTORY", "0")),
+    mmap=os.getenv("ML_TABLE_MMAP", "true").lower() == "true"
+)
+table_tasks: Dict[str, asyncio.Task] = {}
+
+# Optimal timing: departure x booking lead time grid scanned per route model version
+timing_engine = TimingEngine(
+    horizon_days=int(os.getenv("ML_TIMING_HORIZON_DAYS", "365")),
+    max_lead_days=int(os.getenv("ML_TIMING_MAX_LEAD_DAYS", "180")),
+    cache_size=int(os.getenv("ML_TIMING_CACHE_SIZE", "1024"))
+)
+
+
 # Request/Response models
+ISO_DATE_PATTERN = r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$"
+
 class FlightPredictionRequest(BaseModel):
     origin: str = Field(..., min_length=3, max_length=3, description="Origin airport IATA code")
     destination: str = Field(..., min_length=3, max_length=3, description="Destination airport IATA code")
-    departure_date: str = Field(..., description="Departure date (YYYY-MM-DD)")
-    return_date: Optional[str] = Field(None, description="Return date (YYYY-MM-DD)")
-    booking_date: str = Field(..., description="Booking date (YYYY-MM-DD)")
+    departure_date: str = Field(..., pattern=ISO_DATE_PATTERN, description="Departure date (YYYY-MM-DD)")
+    return_date: Optional[str] = Field(None, pattern=ISO_DATE_PATTERN, description="Return date (YYYY-MM-DD)")
+    booking_date: str = Field(..., pattern=ISO_DATE_PATTERN, description="Booking date (YYYY-MM-DD)")
     passengers: int = Field(1, ge=1, le=9, description="Number of passengers")
     cabin: str = Field("economy", description="Cabin class")
     historical_prices: Optional[List[float]] = Field(None, description="Historical price data")
+    
+    @field_validator("departure_date", "return_date", "booking_date")
+    @classmethod
+    def check_calendar_date(cls, value: Optional[str]) -> Optional[str]:
+        # The pattern fixes the format; this rejects days that do not exist (2024-02-30)
+        if value is not None:
+            datetime.fromisoformat(value)
+        return value
 
 class PredictionResponse(BaseModel):
     predicted_price: float
     confidence: float
+    price_interval: Dict[str, float]  # 95% range of the per-tree predictions and their std
     price_trend: str  # "increasing", "decreasing", "stable"
     recommendation: str  # "buy_now", "wait", "book_soon"
     best_booking_window: Dict[str, int]  # days before departure
     factors: Dict[str, float]  # feature importance
 
+class BatchPredictionRequest(BaseModel):
+    requests: List[FlightPredictionRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="Flights to price, answered in order"
+    )
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    total: int
+    routes: int
+
 class DemandForecastRequest(BaseModel):
     origin: str
     destination: str
     start_date: str
     end_date: str
-    granularity: str = "daily"  # daily, weekly, monthly
+    granularity: str = Field("daily", pattern="^(daily|weekly|monthly)$")  # daily, weekly, monthly
+
+class ForecastRoute(BaseModel):
+    origin: str = Field(..., min_length=3, max_length=3, description="Origin airport IATA code")
+    destination: str = Field(..., min_length=3, max_length=3, description="Destination airport IATA code")
+
+class BulkDemandForecastRequest(BaseModel):
+    routes: List[ForecastRoute] = Field(
+        ..., min_length=1, max_length=MAX_FORECAST_ROUTES, description="Routes to forecast, streamed in order"
+    )
+    start_date: str
+    end_date: str
+    granularity: str = Field("daily", pattern="^(daily|weekly|monthly)$")
 
 class DemandForecastResponse(BaseModel):
     route: str
@@ -83,6 +279,7 @@ class OptimalTimingRequest(BaseModel):
     flexible_dates: bool = True
     budget_range: Optional[Dict[str, float]] = None
     preferred_months: Optional[List[str]] = None
+    cabin: str = Field("economy", description="Cabin class")
 
 class OptimalTimingResponse(BaseModel):
     best_months: List[Dict[str, Any]]
@@ -93,95 +290,572 @@ class OptimalTimingResponse(BaseModel):
 # Dependency to get ML models
 async def get_price_model(route: str):
     """Load or train price prediction model for a specific route"""
+    if MODEL_MODE == "global" and route != GLOBAL_MODEL_ROUTE:
+        return await get_global_route_model(route)
+    
     model_key = f"price_model_{route}"
     
-    if model_key not in models:
-        # Try to load from cache/storage
+    model = models.get(model_key) or load_shared_model(model_key)
+    if model is None:
+        cached_model = await redis_client.get(f"ml_model:{model_key}")
+        MODEL_LOOKUPS.labels("redis", "hit" if cached_model else "miss").inc()
+        model = await load_price_model(route, cached_model)
+    
+    return model
+
+async def get_price_models(routes: List[str]) -> Dict[str, Any]:
+    """Resolve models for many routes, fetching Redis misses in one round trip"""
+    if MODEL_MODE == "global":
+        route_models = await asyncio.gather(*(get_global_route_model(route) for route in routes))
+        return dict(zip(routes, route_models))
+    
+    resolved = {}
+    missing = []
+    for route in routes:
+        model_key = f"price_model_{route}"
+        model = models.get(model_key) or load_shared_model(model_key)
+        if model is None:
+            missing.append(route)
+        else:
+            resolved[route] = model
+    
+    if missing:
+        cached_models = await redis_client.mget([f"ml_model:price_model_{route}" for route in missing])
+        for cached_model in cached_models:
+            MODEL_LOOKUPS.labels("redis", "hit" if cached_model else "miss").inc()
+        # Cold routes load or train concurrently, up to the training pool's width
+        loaded = await asyncio.gather(*(
+            load_price_model(route, cached_model) for route, cached_model in zip(missing, cached_models)
+        ))
+        resolved.update(zip(missing, loaded))
+    
+    return resolved
+
+async def get_global_route_model(route: str):
+    """Calibrated view of the shared forest for a route; uncalibrated routes are fitted in the background"""
+    global global_model
+    forest = await get_price_model(GLOBAL_MODEL_ROUTE)
+    if global_model is None or global_model.forest.version != forest.version:
+        # Offsets are residuals of one forest and do not carry over to its replacement
+        global_model = GlobalPriceModel(forest, CALIBRATION_PRIOR_ROWS)
+    else:
+        global_model.forest = forest
+    
+    if route not in global_model.calibration:
+        schedule_route_calibration(route, global_model)
+    return global_model.for_route(route)
+
+def schedule_route_calibration(route: str, model: GlobalPriceModel):
+    """Fit a route's offset off the request path; one in-flight task per route and forest"""
+    task_key = (model.forest.version, route)
+    if task_key in calibration_tasks:
+        return
+    task = asyncio.create_task(calibrate_route(route, model))
+    calibration_tasks[task_key] = task
+    task.add_done_callback(lambda t: _calibration_done(task_key, t))
+
+async def calibrate_route(route: str, model: GlobalPriceModel):
+    X, y = await asyncio.get_running_loop().run_in_executor(training_executor, route_history, route)
+    offset = await asyncio.get_running_loop().run_in_executor(training_executor, model.calibrate, route, X, y)
+    logger.info(f"Calibrated {route} on the global model: offset {offset:+.2f}")
+
+def _calibration_done(task_key: Tuple[str, str], task: asyncio.Task):
+    calibration_tasks.pop(task_key, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error calibrating {task_key[1]}: {task.exception()}")
+
+def load_shared_model(model_key: str):
+    """Map a model another worker published to the arena into this process"""
+    if model_arena is None:
+        return None
+    model = model_arena.load(model_key)
+    MODEL_LOOKUPS.labels("arena", "miss" if model is None else "hit").inc()
+    if model is not None:
+        models[model_key] = model
+    return model
+
+async def share_model(model_key: str, model):
+    """Publish a model to the arena and return the shared mapping (the private model if that fails)"""
+    if model_arena is None:
+        return model
+    try:
+        shared = await asyncio.get_running_loop().run_in_executor(None, model_arena.publish, model_key, model)
+    except Exception as e:
+        logger.error(f"Error publishing {model_key} to the shared arena: {e}")
+        return model
+    return shared if shared is not None else model
+
+def adopt_shared_models(model_keys: List[str]) -> List[str]:
+    """
+    Swap in models that another worker replaced in the arena and release models
+    pruned from it; returns the adopted keys
+    """
+    if model_arena is None:
+        return []
+    adopted = []
+    for model_key, model in model_arena.refresh(model_keys).items():
+        if model is None:
+            # Pruned: unmap so tmpfs can free the pages, keeping a disk copy like an eviction
+            current = models.peek(model_key)
+            if current is not None:
+                del models[model_key]
+                spill_model(model_key, current)
+                logger.info(f"Released {model_key} after it was pruned from the shared arena")
+            continue
+        models[model_key] = model
+        result_cache.invalidate_route(model_key[len("price_model_"):])
+        adopted.append(model_key)
+    return adopted
+
+async def publish_metrics():
+    """Multiprocess metrics: keep this worker's cache gauges current between scrapes"""
+    while True:
+        try:
+            publish_cache_stats()
+        except Exception as e:
+            logger.error(f"Publishing cache metrics failed: {e}")
+        await asyncio.sleep(METRICS_PUBLISH_SECONDS)
+
+async def sync_shared_models():
+    while True:
+        await asyncio.sleep(ARENA_SYNC_SECONDS)
         try:
-            cached_model = redis_client.get(f"ml_model:{model_key}")
-            if cached_model:
-                models[model_key] = joblib.loads(cached_model.encode())
-            else:
-                # Train new model with historical data
-                models[model_key] = await train_price_model(route)
+            adopted = adopt_shared_models(models.keys())
+            if adopted:
+                logger.info(f"Adopted {len(adopted)} models replaced by other workers")
         except Exception as e:
-            logger.error(f"Error loading model for {route}: {e}")
-            # Use default model
-            models[model_key] = create_default_price_model()
+            logger.error(f"Shared model sync failed: {e}")
+
+async def load_price_model(route: str, cached_model: Optional[bytes]):
+    """Materialize a route model from Redis bytes, the disk tier or training"""
+    model_key = f"price_model_{route}"
+    
+    # Try to load from cache/storage
+    try:
+        if cached_model:
+            model = deserialize_forest(cached_model)
+        else:
+            model = await asyncio.get_running_loop().run_in_executor(
+                None, load_model_from_disk, model_key
+            )
+            MODEL_LOOKUPS.labels("disk", "miss" if model is None else "hit").inc()
+        
+        if model is not None:
+            model = await share_model(model_key, model)
+            models[model_key] = model
+        elif COLD_ROUTE_FALLBACK:
+            # Answer from the shared fallback while the route trains
+            MODEL_LOOKUPS.labels("training", "fallback").inc()
+            schedule_route_training(route)
+            return get_fallback_model()
+        else:
+            # Train new model with historical data
+            MODEL_LOOKUPS.labels("training", "wait").inc()
+            return await asyncio.shield(schedule_route_training(route))
+    except Exception as e:
+        MODEL_LOOKUPS.labels("default", "error").inc()
+        logger.error(f"Error loading model for {route}: {e}")
+        # Use default model
+        model = create_default_price_model()
+        models[model_key] = model
     
-    return models[model_key]
+    return model
+
+def _model_path(model_key: str) -> str:
+    return os.path.join(MODEL_STORE_DIR, f"{model_key}.skyf")
+
+def save_model_to_disk(model_key: str, model):
+    """Write a model to the disk tier"""
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    write_forest(_model_path(model_key), flatten_forest(model), compress=MODEL_COMPRESSION)
+
+def load_model_from_disk(model_key: str):
+    """Read a model from the disk tier, or None if it was never spilled"""
+    path = _model_path(model_key)
+    if not os.path.exists(path):
+        return None
+    return load_forest(path)
+
+def schedule_route_training(route: str, validate: bool = False) -> asyncio.Task:
+    """
+    Start training for a route, or join the training already in flight. With
+    validate the trained model replaces the serving one only if it passes
+    validate_price_model; either way the task returns the model serving afterwards.
+    """
+    model_key = f"price_model_{route}"
+    task = training_tasks.get(model_key)
+    if task is None:
+        task = asyncio.create_task(_train_and_store(route, validate))
+        training_tasks[model_key] = task
+        task.add_done_callback(lambda t: _training_done(model_key, t))
+    return task
+
+async def _train_and_store(route: str, validate: bool = False):
+    current = models.peek(f"price_model_{route}")
+    model = await train_price_model(route)
+    if validate and not validate_price_model(model, current):
+        logger.warning(f"Keeping the serving model for {route}: retrained model failed validation")
+        if current is None:
+            raise ValueError(f"Retrained model for {route} failed validation")
+        return current
+    await store_price_model(route, model)
+    return model
+
+async def store_price_model(route: str, model):
+    """Make a trained model the serving one and replace its Redis and disk copies"""
+    model_key = f"price_model_{route}"
+    model = await share_model(model_key, model)
+    
+    # One reference swap; in-flight requests finish on the model they already hold
+    models[model_key] = model
+    result_cache.invalidate_route(route)
+    if INFERENCE_MODE == "table":
+        lookup_table(model)
+    
+    # Cache the model
+    try:
+        model_bytes = serialize_forest(model, compress=MODEL_COMPRESSION)
+        await redis_client.setex(f"ml_model:{model_key}", MODEL_REDIS_TTL, model_bytes)
+        if os.path.exists(_model_path(model_key)):
+            await asyncio.get_running_loop().run_in_executor(None, save_model_to_disk, model_key, model)
+    except Exception as e:
+        logger.error(f"Error caching model: {e}")
+
+def validate_price_model(candidate, current=None) -> bool:
+    """Sanity-check a retrained model on probe rows before it replaces the serving one"""
+    probe = validation_features()
+    predicted = candidate.predict(probe)
+    if not np.all(np.isfinite(predicted)) or np.any(predicted < 0):
+        logger.warning("Retrained model produced non-finite or negative prices")
+        return False
+    
+    if current is not None:
+        baseline = current.predict(probe)
+        drift = float(np.median(np.abs(predicted - baseline) / np.maximum(np.abs(baseline), 1.0)))
+        if drift > RETRAIN_MAX_DRIFT:
+            logger.warning(f"Retrained model drifted {drift:.1%} from the serving model")
+            return False
+    return True
+
+async def refresh_route_model(route: str) -> bool:
+    """
+    Retrain a route off the request path (double-buffered): the serving model
+    keeps answering until the new one validates, then the two are swapped.
+    """
+    if MODEL_MODE == "global" and route != GLOBAL_MODEL_ROUTE:
+        # In global mode a route owns only its calibration offset
+        await get_global_route_model(route)
+        model = global_model
+        pending = calibration_tasks.get((model.forest.version, route))
+        await (asyncio.shield(pending) if pending is not None else calibrate_route(route, model))
+        RETRAINS.labels("calibrated").inc()
+        return True
+    
+    model_key = f"price_model_{route}"
+    # Another worker may already have refreshed this route in the shared arena
+    if adopt_shared_models([model_key]):
+        RETRAINS.labels("adopted").inc()
+        return True
+    
+    current = models.peek(model_key)
+    try:
+        # Shares the route's single-flight training, so a cold load or another
+        # refresh already training this route is joined rather than repeated
+        model = await asyncio.shield(schedule_route_training(route, validate=True))
+    except Exception:
+        RETRAINS.labels("failed").inc()
+        raise
+    
+    if model is current:
+        RETRAINS.labels("rejected").inc()
+        return False
+    
+    RETRAINS.labels("refreshed").inc()
+    return True
+
+def resident_model_ages() -> Dict[str, Optional[float]]:
+    """Training time of every in-process route model, by route"""
+    prefix = "price_model_"
+    return {
+        key[len(prefix):]: getattr(models.peek(key), "trained_at", None)
+        for key in models.keys()
+        if key.startswith(prefix)
+    }
+
+def _training_done(model_key: str, task: asyncio.Task):
+    training_tasks.pop(model_key, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error training {model_key}: {task.exception()}")
 
 async def train_price_model(route: str):
     """Train a price prediction model for a specific route"""
     logger.info(f"Training price model for route: {route}")
     
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        model = await loop.run_in_executor(training_executor, fit_price_model, route)
+    except Exception:
+        TRAINING_SECONDS.labels("error").observe(time.perf_counter() - started)
+        raise
+    TRAINING_SECONDS.labels("success").observe(time.perf_counter() - started)
+    
+    return model
+
+def route_history(route: str, rows: int = ROUTE_TRAINING_ROWS):
+    """Feature rows and observed prices for a route ("global" pools every route)"""
     # In production, this would load real historical data
-    # For now, create a mock model
+    # For now, generate mock training data
+    X = np.random.rand(rows, 8)  # 8 features
+    y = np.random.rand(rows) * 500 + 200  # Prices between $200-$700
+    return X, y
+
+def fit_price_model(route: str):
+    """Fit and flatten the route model; blocking, so callers run it in the training executor"""
+    # Training-only dependency, imported on first use to keep cold starts fast
+    from sklearn.ensemble import RandomForestRegressor
+    
     model = RandomForestRegressor(
         n_estimators=100,
         max_depth=10,
         random_state=42
     )
     
-    # Generate mock training data
-    X = np.random.rand(1000, 8)  # 8 features
-    y = np.random.rand(1000) * 500 + 200  # Prices between $200-$700
-    
+    X, y = route_history(route, GLOBAL_TRAINING_ROWS if route == GLOBAL_MODEL_ROUTE else ROUTE_TRAINING_ROWS)
     model.fit(X, y)
-    
-    # Cache the model
-    try:
-        model_bytes = joblib.dumps(model)
-        redis_client.setex(f"ml_model:price_model_{route}", 3600, model_bytes)
-    except Exception as e:
-        logger.error(f"Error caching model: {e}")
-    
-    return model
+    return flatten_forest(model, version=uuid.uuid4().hex[:12], trained_at=time.time())
+
+def get_fallback_model():
+    """Shared low-cost model used for cold routes while they train"""
+    global fallback_model
+    if fallback_model is None:
+        fallback_model = create_default_price_model()
+    return fallback_model
 
 def create_default_price_model():
     """Create a simple default model"""
+    from sklearn.ensemble import RandomForestRegressor
+    
     model = RandomForestRegressor(n_estimators=50, random_state=42)
     # Train with minimal data
     X = np.random.rand(100, 8)
     y = np.random.rand(100) * 400 + 200
     model.fit(X, y)
-    return model
+    return flatten_forest(model, version=f"default-{uuid.uuid4().hex[:8]}", trained_at=time.time())
 
 def extract_features(request: FlightPredictionRequest) -> np.ndarray:
     """Extract features from the prediction request"""
+    return extract_features_batch([request])
+
+def extract_features_batch(requests: List[FlightPredictionRequest]) -> np.ndarray:
+    """Extract features for many requests as a single (n, 8) matrix"""
+    
+    # Parse all dates in one pass
+    departure = np.array([r.departure_date for r in requests], dtype="datetime64[D]")
+    booking = np.array([r.booking_date for r in requests], dtype="datetime64[D]")
     
-    # Parse dates
-    departure = datetime.strptime(request.departure_date, "%Y-%m-%d")
-    booking = datetime.strptime(request.booking_date, "%Y-%m-%d")
-    
-    # Calculate features
-    days_ahead = (departure - booking).days
-    day_of_week = departure.weekday()
-    month = departure.month
-    is_weekend = 1 if day_of_week >= 5 else 0
-    is_holiday_season = 1 if month in [6, 7, 8, 12] else 0
-    
-    # Cabin encoding
-    cabin_encoding = {
-        "economy": 0,
-        "premium_economy": 1,
-        "business": 2,
-        "first": 3
+    passengers = np.fromiter((r.passengers for r in requests), dtype=np.int64, count=len(requests))
+    cabin_encoded = np.fromiter(
+        (CABIN_ENCODING.get(r.cabin, 0) for r in requests), dtype=np.int64, count=len(requests)
+    )
+    history_length = np.fromiter(
+        (len(r.historical_prices) if r.historical_prices else 0 for r in requests),
+        dtype=np.int64,
+        count=len(requests)
+    )
+    
+    return price_feature_matrix(departure, booking, passengers, cabin_encoded, history_length)
+
+def lookup_table(model):
+    """The model's spread table, scheduling its build off the request path on first use"""
+    # Calibrated route views share the global forest's table
+    forest = getattr(model, "forest", model)
+    version = getattr(forest, "version", None)
+    if version is None:
+        return None
+    table = lookup_tables.get(version)
+    if table is None and not lookup_tables.known(version) and version not in table_tasks:
+        task = asyncio.get_running_loop().run_in_executor(training_executor, lookup_tables.load_or_build, forest)
+        table_tasks[version] = task
+        task.add_done_callback(lambda t: _table_done(version, t))
+    return table
+
+def _table_done(version: str, task: asyncio.Future):
+    table_tasks.pop(version, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error building lookup table for {version}: {task.exception()}")
+
+async def predict_cached(route: str, model, features: np.ndarray) -> np.ndarray:
+    """
+    Per-row mean, std, lower and upper price over the route model's trees
+    (see SPREAD_COLUMNS), served from the lookup table or the result cache where possible
+    """
+    table = lookup_table(model) if INFERENCE_MODE == "table" else None
+    if table is not None:
+        predicted, inside = table.lookup(features, getattr(model, "offset", 0.0))
+        if not inside.all():
+            # Out-of-grid rows (e.g. bookings beyond ML_TABLE_MAX_DAYS) fall back to the forest
+            predicted[~inside] = await micro_batcher.submit(route, model, features[~inside])
+        return predicted
+    
+    version = getattr(model, "version", None) or "unversioned"
+    predicted = await result_cache.get_many(route, version, features)
+    
+    missing = np.isnan(predicted).any(axis=1)
+    if missing.any():
+        computed = await micro_batcher.submit(route, model, features[missing])
+        predicted[missing] = computed
+        await result_cache.put_many(route, version, features[missing], computed)
+    
+    return predicted
+
+def build_prediction_response(
+    request: FlightPredictionRequest, spread: np.ndarray, confidence: float
+) -> PredictionResponse:
+    """Turn one row of model spread output and its confidence into the public prediction response"""
+    predicted_price, std, lower, upper = (float(v) for v in spread)
+    
+    # Determine trend and recommendation
+    if request.historical_prices and len(request.historical_prices) > 1:
+        recent_trend = np.mean(request.historical_prices[-3:]) - np.mean(request.historical_prices[-6:-3])
+        if recent_trend > 10:
+            trend = "increasing"
+            recommendation = "book_soon"
+        elif recent_trend < -10:
+            trend = "decreasing"
+            recommendation = "wait"
+        else:
+            trend = "stable"
+            recommendation = "buy_now" if predicted_price < 400 else "wait"
+    else:
+        trend = "stable"
+        recommendation = "buy_now"
+    
+    # Feature importance (mock)
+    factors = {
+        "booking_advance": 0.35,
+        "seasonality": 0.25,
+        "day_of_week": 0.15,
+        "cabin_class": 0.15,
+        "demand": 0.10
     }
-    cabin_encoded = cabin_encoding.get(request.cabin, 0)
     
-    features = np.array([
-        days_ahead,
-        day_of_week,
-        month,
-        is_weekend,
-        is_holiday_season,
-        request.passengers,
-        cabin_encoded,
-        len(request.historical_prices) if request.historical_prices else 0
-    ]).reshape(1, -1)
+    return PredictionResponse(
+        predicted_price=round(predicted_price, 2),
+        confidence=round(confidence, 3),
+        price_interval={"lower": round(lower, 2), "upper": round(upper, 2), "std": round(std, 2)},
+        price_trend=trend,
+        recommendation=recommendation,
+        best_booking_window={"min_days": 21, "max_days": 60},
+        factors=factors
+    )
+
+def warmup_features() -> np.ndarray:
+    """Feature row for a throwaway request, used to prime models and the extraction path"""
+    dummy = FlightPredictionRequest(
+        origin="AAA",
+        destination="BBB",
+        departure_date="2024-07-01",
+        booking_date="2024-05-15"
+    )
+    return extract_features_batch([dummy])
+
+_validation_features: Optional[np.ndarray] = None
+
+def validation_features() -> np.ndarray:
+    """Probe rows spanning booking windows, months, cabins and party sizes"""
+    global _validation_features
+    if _validation_features is None:
+        departures = [f"2025-{month:02d}-15" for month in range(1, 13)]
+        requests = [
+            FlightPredictionRequest(
+                origin="AAA",
+                destination="BBB",
+                departure_date=departure,
+                booking_date=str(np.datetime64(departure) - np.timedelta64(days_ahead, "D")),
+                passengers=passengers,
+                cabin=cabin
+            )
+            for departure in departures
+            for days_ahead in (3, 21, 90)
+            for cabin in ("economy", "business")
+            for passengers in (1, 4)
+        ]
+        _validation_features = extract_features_batch(requests)
+    return _validation_features
+
+def prime_model(model):
+    """Run a throwaway prediction so lazy code paths and mapped pages are loaded"""
+    model.predict(warmup_features())
+
+async def warm_up_models():
+    """Load hot routes in parallel and prime them before reporting ready"""
+    routes = list(HOT_ROUTES)
+    if WARMUP_TOP_N > 0:
+        for route in await route_traffic.top_routes(WARMUP_TOP_N):
+            if route not in routes:
+                routes.append(route)
+    
+    warmup_progress.start(routes)
+    logger.info(f"Warming up {len(routes)} route models")
+    semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    
+    async def warm(route: str):
+        async with semaphore:
+            try:
+                model = await get_price_model(route)
+                # With the cold-route fallback enabled, wait for the real model
+                task = training_tasks.get(f"price_model_{route}")
+                if task is not None:
+                    model = await asyncio.shield(task)
+                prime_model(model)
+                warmup_progress.loaded += 1
+            except Exception as e:
+                warmup_progress.failed += 1
+                logger.error(f"Error warming up {route}: {e}")
     
-    return features
+    await asyncio.gather(*(warm(route) for route in routes))
+    
+    # Prime the shared feature extraction path even when no routes are configured
+    warmup_features()
+    warmup_progress.finish()
+    logger.info(f"Warm-up finished: {warmup_progress.snapshot()}")
+
+def start_background_task(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+retrain_scheduler = RetrainScheduler(
+    refresh=refresh_route_model,
+    candidates=resident_model_ages,
+    traffic=route_traffic.scores,
+    max_age=MODEL_UPDATE_INTERVAL,
+    check_interval=RETRAIN_CHECK_SECONDS,
+    max_concurrent=RETRAIN_CONCURRENCY,
+    batch_size=RETRAIN_BATCH_SIZE
+)
+
+@app.on_event("startup")
+async def start_warmup():
+    """Warm up in the background so /health answers while /ready gates traffic"""
+    start_background_task(warm_up_models())
+    start_background_task(route_traffic.flush_forever())
+    if MODEL_UPDATE_INTERVAL > 0:
+        start_background_task(retrain_scheduler.run_forever())
+    if model_arena is not None:
+        start_background_task(sync_shared_models())
+    if MULTIPROC_DIR is not None:
+        start_background_task(publish_metrics())
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness endpoint: 503 until the hot route set is resident"""
+    progress = warmup_progress.snapshot()
+    if not warmup_progress.ready:
+        response.status_code = 503
+    return progress
 
 @app.get("/health")
 async def health_check():
@@ -190,7 +864,7 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "models_loaded": len(models),
-        "redis_connected": redis_client.ping()
+        "redis_connected": await redis_client.ping()
     }
 
 @app.post("/predict/price", response_model=PredictionResponse)
@@ -198,55 +872,185 @@ async def predict_price(request: FlightPredictionRequest):
     """Predict flight price using machine learning"""
     try:
         route = f"{request.origin}-{request.destination}"
+        timer = StageTimer("/predict/price", route_bucket(route))
+        route_traffic.record(route)
         model = await get_price_model(route)
+        timer.mark("model_lookup")
         
         # Extract features
         features = extract_features(request)
+        timer.mark("features")
         
         # Make prediction
-        predicted_price = model.predict(features)[0]
+        spread = (await predict_cached(route, model, features))[0]
+        confidence = float(spread_confidence(spread[0], spread[2], spread[3]))
+        timer.mark("predict")
         
-        # Calculate confidence (mock implementation)
-        confidence = min(0.95, max(0.6, np.random.random() * 0.4 + 0.6))
+        # Serialize here rather than in FastAPI so the stage is measured
+        body = build_prediction_response(request, spread, confidence).model_dump_json()
+        timer.mark("serialize")
+        return Response(content=body, media_type="application/json")
         
-        # Determine trend and recommendation
-        if request.historical_prices and len(request.historical_prices) > 1:
-            recent_trend = np.mean(request.historical_prices[-3:]) - np.mean(request.historical_prices[-6:-3])
-            if recent_trend > 10:
-                trend = "increasing"
-                recommendation = "book_soon"
-            elif recent_trend < -10:
-                trend = "decreasing"
-                recommendation = "wait"
-            else:
-                trend = "stable"
-                recommendation = "buy_now" if predicted_price < 400 else "wait"
-        else:
-            trend = "stable"
-            recommendation = "buy_now"
+    except Exception as e:
+        logger.error(f"Error predicting price: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/price/batch", response_model=BatchPredictionResponse)
+async def predict_price_batch(batch: BatchPredictionRequest):
+    """Predict prices for many flights with one model call per route"""
+    try:
+        requests = batch.requests
+        timer = StageTimer("/predict/price/batch")
+        features = extract_features_batch(requests)
+        timer.mark("features")
         
-        # Feature importance (mock)
-        factors = {
-            "booking_advance": 0.35,
-            "seasonality": 0.25,
-            "day_of_week": 0.15,
-            "cabin_class": 0.15,
-            "demand": 0.10
-        }
+        # Group row indices by route so each route model predicts once
+        route_rows: Dict[str, List[int]] = {}
+        for i, request in enumerate(requests):
+            route_rows.setdefault(f"{request.origin}-{request.destination}", []).append(i)
+        for route, rows in route_rows.items():
+            route_traffic.record(route, len(rows))
         
-        return PredictionResponse(
-            predicted_price=round(predicted_price, 2),
-            confidence=round(confidence, 3),
-            price_trend=trend,
-            recommendation=recommendation,
-            best_booking_window={"min_days": 21, "max_days": 60},
-            factors=factors
-        )
+        route_models = await get_price_models(list(route_rows))
+        timer.mark("model_lookup")
+        
+        predicted = np.empty((len(requests), len(SPREAD_COLUMNS)), dtype=np.float64)
+        for route, rows in route_rows.items():
+            model = route_models[route]
+            idx = np.asarray(rows, dtype=np.intp)
+            predicted[idx] = await predict_cached(route, model, features[idx])
+        confidence = spread_confidence(predicted[:, 0], predicted[:, 2], predicted[:, 3])
+        timer.mark("predict")
+        
+        predictions = [
+            build_prediction_response(request, spread, float(c))
+            for request, spread, c in zip(requests, predicted, confidence)
+        ]
+        
+        body = BatchPredictionResponse(
+            predictions=predictions,
+            total=len(predictions),
+            routes=len(route_rows)
+        ).model_dump_json()
+        timer.mark("serialize")
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Error predicting price: {e}")
+        logger.error(f"Error predicting batch prices: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def build_demand_forecast(start_date: str, end_date: str, granularity: str = "daily") -> List[Dict[str, Any]]:
+    """Vectorized mock demand forecast, aggregated server-side to the requested granularity"""
+    
+    dates = np.arange(
+        np.datetime64(start_date, "D"),
+        np.datetime64(end_date, "D") + 1,
+        dtype="datetime64[D]"
+    )
+    if len(dates) == 0:
+        return []
+    
+    # Mock demand calculation
+    base_demand = 100
+    calendar = CALENDAR.lookup(dates)
+    day_of_week = calendar["day_of_week"].astype(np.int64)
+    seasonal_factor = np.where(calendar["is_holiday_season"], 1.2, 1.0)
+    weekend_factor = np.where(calendar["is_weekend"], 1.3, 1.0)
+    
+    noise = 0.8 + np.random.random(len(dates)) * 0.4
+    demand = (base_demand * seasonal_factor * weekend_factor * noise).astype(np.int64)
+    confidence = np.random.random(len(dates)) * 0.3 + 0.7
+    
+    if granularity == "daily":
+        return [
+            {"date": date, "demand": int(d), "confidence": round(float(c), 2)}
+            for date, d, c in zip(np.datetime_as_string(dates, unit="D").tolist(), demand, confidence)
+        ]
+    
+    # Bucket days into ISO weeks (starting Monday) or calendar months
+    if granularity == "weekly":
+        period_start = dates - day_of_week.astype("timedelta64[D]")
+    else:
+        period_start = dates.astype("datetime64[M]").astype("datetime64[D]")
+    
+    # Periods are contiguous runs because dates are sorted
+    starts = np.flatnonzero(np.r_[True, period_start[1:] != period_start[:-1]])
+    days = np.diff(np.r_[starts, len(dates)])
+    ends = starts + days - 1
+    total_demand = np.add.reduceat(demand, starts)
+    mean_confidence = np.add.reduceat(confidence, starts) / days
+    
+    return [
+        {
+            "date": first,
+            "end": last,
+            "days": int(n),
+            "demand": int(total),
+            "avg_daily_demand": round(float(total) / int(n), 1),
+            "confidence": round(float(c), 2)
+        }
+        for first, last, n, total, c in zip(
+            np.datetime_as_string(dates[starts], unit="D").tolist(),
+            np.datetime_as_string(dates[ends], unit="D").tolist(),
+            days,
+            total_demand,
+            mean_confidence
+        )
+    ]
+
+def forecast_chunks(
+    start: np.datetime64, end: np.datetime64, granularity: str, chunk_days: int
+) -> List[Tuple[np.datetime64, np.datetime64]]:
+    """Split [start, end] into ranges of about chunk_days (>= 31) that never split a week or month"""
+    chunks = []
+    while start <= end:
+        stop = start + chunk_days
+        if granularity == "weekly":
+            # Back to the Monday (1970-01-01 was a Thursday, weekday 3)
+            stop -= (stop.astype(np.int64) + 3) % 7
+        elif granularity == "monthly":
+            stop = stop.astype("datetime64[M]").astype("datetime64[D]")
+        chunks.append((start, min(stop - 1, end)))
+        start = stop
+    return chunks
+
+async def stream_demand_forecasts(
+    routes: List[ForecastRoute], chunks: List[Tuple[np.datetime64, np.datetime64]], granularity: str
+) -> AsyncIterator[bytes]:
+    """
+    NDJSON lines of {"route", "period", "forecast"}, one per route and date chunk, then a
+    {"done": true} trailer. Lines are serialized as they are computed and flushed in
+    FORECAST_FLUSH_BYTES writes, so memory stays at one chunk plus the write buffer.
+    A failure after streaming started is reported as a final {"error": ...} line.
+    """
+    pending: List[str] = []
+    size = 0
+    lines = 0
+    try:
+        for route in routes:
+            name = f"{route.origin}-{route.destination}"
+            for start, end in chunks:
+                first, last = str(start), str(end)
+                line = json.dumps(
+                    {"route": name, "period": {"start": first, "end": last},
+                     "forecast": build_demand_forecast(first, last, granularity)},
+                    separators=(",", ":")
+                )
+                pending.append(line)
+                size += len(line) + 1
+                lines += 1
+                if size >= FORECAST_FLUSH_BYTES:
+                    yield ("\n".join(pending) + "\n").encode()
+                    pending = []
+                    size = 0
+            # Other requests run between routes even while the client keeps up
+            await asyncio.sleep(0)
+        pending.append(json.dumps({"done": True, "routes": len(routes), "lines": lines}))
+    except Exception as e:
+        logger.error(f"Error streaming demand forecasts: {e}")
+        pending.append(json.dumps({"error": str(e), "lines": lines}))
+    yield ("\n".join(pending) + "\n").encode()
+
 @app.post("/forecast/demand", response_model=DemandForecastResponse)
 async def forecast_demand(request: DemandForecastRequest):
     """Forecast travel demand for a route"""
@@ -254,28 +1058,7 @@ async def forecast_demand(request: DemandForecastRequest):
         route = f"{request.origin}-{request.destination}"
         
         # Generate mock forecast data
-        start_date = datetime.strptime(request.start_date, "%Y-%m-%d")
-        end_date = datetime.strptime(request.end_date, "%Y-%m-%d")
-        
-        # Create daily forecasts
-        forecast = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            # Mock demand calculation
-            base_demand = 100
-            seasonal_factor = 1.2 if current_date.month in [6, 7, 8, 12] else 1.0
-            weekend_factor = 1.3 if current_date.weekday() >= 5 else 1.0
-            
-            demand = int(base_demand * seasonal_factor * weekend_factor * (0.8 + np.random.random() * 0.4))
-            
-            forecast.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "demand": demand,
-                "confidence": round(np.random.random() * 0.3 + 0.7, 2)
-            })
-            
-            current_date += timedelta(days=1)
+        forecast = build_demand_forecast(request.start_date, request.end_date, request.granularity)
         
         # Identify peak periods
         peak_periods = [
@@ -303,33 +1086,41 @@ async def forecast_demand(request: DemandForecastRequest):
         logger.error(f"Error forecasting demand: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/forecast/demand/bulk")
+async def forecast_demand_bulk(request: BulkDemandForecastRequest):
+    """Stream demand forecasts for many routes as NDJSON, route by route"""
+    try:
+        start = np.datetime64(request.start_date, "D")
+        end = np.datetime64(request.end_date, "D")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {e}")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    
+    chunks = forecast_chunks(start, end, request.granularity, FORECAST_CHUNK_DAYS)
+    return StreamingResponse(
+        stream_demand_forecasts(request.routes, chunks, request.granularity),
+        media_type="application/x-ndjson"
+    )
+
 @app.post("/optimize/timing", response_model=OptimalTimingResponse)
 async def optimize_timing(request: OptimalTimingRequest):
     """Find optimal travel timing for best prices"""
     try:
-        # Mock optimal timing analysis
-        best_months = [
-            {"month": "February", "avg_price": 285, "savings": 25},
-            {"month": "November", "avg_price": 310, "savings": 15},
-            {"month": "March", "avg_price": 335, "savings": 10}
-        ]
-        
-        cheapest_days = ["Tuesday", "Wednesday", "Saturday"]
-        
-        optimal_booking_lead_time = 47  # days
+        route = f"{request.origin}-{request.destination}"
+        model = await get_price_model(route)
         
-        seasonal_analysis = {
-            "peak_season_premium": 0.35,
-            "shoulder_season_discount": 0.15,
-            "off_season_discount": 0.25,
-            "holiday_premium": 0.45
-        }
+        # One batched predict over the departure x lead time grid, off the event loop
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            None, timing_engine.analyze, route, model, CABIN_ENCODING.get(request.cabin, 0)
+        )
         
+        max_price = (request.budget_range or {}).get("max")
         return OptimalTimingResponse(
-            best_months=best_months,
-            cheapest_days=cheapest_days,
-            optimal_booking_lead_time=optimal_booking_lead_time,
-            seasonal_analysis=seasonal_analysis
+            best_months=analysis.best_months(preferred=request.preferred_months, max_price=max_price),
+            cheapest_days=analysis.cheapest_days(),
+            optimal_booking_lead_time=analysis.optimal_lead_time,
+            seasonal_analysis=analysis.seasonal_analysis()
         )
         
     except Exception as e:
@@ -340,34 +1131,55 @@ async def optimize_timing(request: OptimalTimingRequest):
 async def models_status():
     """Get status of all loaded models"""
     return {
-        "loaded_models": list(models.keys()),
+        "loaded_models": models.keys(),
         "total_models": len(models),
-        "cache_size": len(models),
-        "redis_status": "connected" if redis_client.ping() else "disconnected"
+        "cache_size": models.current_bytes,
+        "cache": models.stats(),
+        "redis_status": "connected" if await redis_client.ping() else "disconnected",
+        "redis": redis_client.status(),
+        "result_cache": result_cache.stats(),
+        "retraining": retrain_scheduler.stats(),
+        "timing": timing_engine.stats(),
+        "micro_batching": micro_batcher.stats(),
+        "inference_mode": INFERENCE_MODE,
+        "lookup_tables": lookup_tables.stats(),
+        "arena": model_arena.stats() if model_arena is not None else None,
+        "mode": MODEL_MODE,
+        "global_model": global_model.stats() if global_model is not None else None
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage latencies, model/result cache counters, training and Redis timings"""
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.post("/models/retrain/{route}")
 async def retrain_model(route: str):
     """Retrain model for a specific route"""
     try:
-        # Remove existing model
-        model_key = f"price_model_{route}"
-        if model_key in models:
-            del models[model_key]
-        
-        # Clear cache
-        redis_client.delete(f"ml_model:{model_key}")
-        
-        # Train new model
-        new_model = await train_price_model(route)
-        models[model_key] = new_model
+        # The current model keeps serving until the retrained one validates and is swapped in
+        if not await refresh_route_model(route):
+            raise HTTPException(
+                status_code=409, detail=f"Retrained model for {route} failed validation; current model kept"
+            )
         
         return {"message": f"Model retrained for route {route}", "status": "success"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retraining model: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("shutdown")
+async def shutdown_background_resources():
+    """Stop background work, flush traffic counts and release pooled Redis connections"""
+    for task in list(background_tasks):
+        task.cancel()
+    training_executor.shutdown(wait=False, cancel_futures=True)
+    await route_traffic.flush()
+    await redis_client.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,232 @@
+import glob
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Set (before prometheus_client is imported) when several uvicorn workers serve the app:
+# every process writes its samples under this directory and /metrics aggregates them all
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Sub-millisecond resolution for the hot path, up to the seconds a cold-route training takes
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+TRAINING_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+BATCH_ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+REQUEST_SECONDS = Histogram(
+    "ml_request_duration_seconds",
+    "End-to-end request latency, including validation and response serialization",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "ml_stage_duration_seconds",
+    "Latency of one stage of a prediction request",
+    ["endpoint", "stage", "route_bucket"],
+    buckets=LATENCY_BUCKETS
+)
+MODEL_LOOKUPS = Counter(
+    "ml_model_lookups_total",
+    "Route model lookups past the in-process cache, by tier and outcome",
+    ["tier", "result"]
+)
+RETRAINS = Counter(
+    "ml_model_retrains_total",
+    "Background and on-demand model refreshes by outcome",
+    ["outcome"]
+)
+TRAINING_SECONDS = Histogram(
+    "ml_model_training_duration_seconds",
+    "Route model training time",
+    ["outcome"],
+    buckets=TRAINING_BUCKETS
+)
+MICROBATCH_ROWS = Histogram(
+    "ml_microbatch_rows",
+    "Feature rows per coalesced model call",
+    buckets=BATCH_ROW_BUCKETS
+)
+MICROBATCH_WAIT_SECONDS = Histogram(
+    "ml_microbatch_wait_seconds",
+    "Time a request waited for its micro-batch to be flushed",
+    buckets=LATENCY_BUCKETS
+)
+REDIS_SECONDS = Histogram(
+    "ml_redis_duration_seconds",
+    "Redis round-trip time by operation and outcome",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+class RouteBuckets:
+    """
+    Maps routes to a bounded label set: tracked routes keep their name,
+    everything else is reported as "other", so label cardinality does not
+    grow with the route space.
+    """
+
+    def __init__(self, routes: Iterable[str]):
+        self.routes = frozenset(routes)
+
+    def __call__(self, route: str) -> str:
+        return route if route in self.routes else "other"
+
+
+class StageTimer:
+    """Times consecutive stages of one request; each mark() closes the current stage"""
+
+    __slots__ = ("endpoint", "route_bucket", "last")
+
+    def __init__(self, endpoint: str, route_bucket: str = "all"):
+        self.endpoint = endpoint
+        self.route_bucket = route_bucket
+        self.last = time.perf_counter()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        STAGE_SECONDS.labels(self.endpoint, stage, self.route_bucket).observe(now - self.last)
+        self.last = now
+
+
+def observe_redis(operation: str, outcome: str, seconds: float):
+    REDIS_SECONDS.labels(operation, outcome).observe(seconds)
+
+
+def observe_microbatch(rows: int, waits: Iterable[float]):
+    MICROBATCH_ROWS.observe(rows)
+    for wait in waits:
+        MICROBATCH_WAIT_SECONDS.observe(wait)
+
+
+class RequestMetricsMiddleware:
+    """Plain ASGI middleware recording REQUEST_SECONDS per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by the matched template (/models/retrain/{route}), never the raw path
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.labels(endpoint, scope["method"], str(status)).observe(time.perf_counter() - started)
+
+
+class CacheStatsCollector:
+    """Reports the model and result cache counters they already keep, read at scrape time"""
+
+    def __init__(self, model_cache: Any, result_cache: Any):
+        self.model_cache = model_cache
+        self.result_cache = result_cache
+        self._gauges: Dict[str, Gauge] = {}
+
+    def collect(self):
+        models = self.model_cache.stats()
+        yield GaugeMetricFamily("ml_model_cache_bytes", "Bytes held by the in-process model cache", value=models["bytes"])
+        yield GaugeMetricFamily(
+            "ml_model_cache_shared_bytes", "Model cache bytes mapped from the shared arena", value=models["shared_bytes"]
+        )
+        yield GaugeMetricFamily("ml_model_cache_max_bytes", "In-process model cache budget", value=models["max_bytes"])
+        yield GaugeMetricFamily("ml_model_cache_models", "Models held in process", value=models["entries"])
+        lookups = CounterMetricFamily("ml_model_cache_lookups", "In-process model cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], models["hits"])
+        lookups.add_metric(["miss"], models["misses"])
+        yield lookups
+        yield CounterMetricFamily("ml_model_cache_evictions", "Models evicted to the disk tier", value=models["evictions"])
+
+        results = self.result_cache.stats()
+        yield GaugeMetricFamily("ml_result_cache_entries", "Prediction results held in process", value=results["entries"])
+        hits = CounterMetricFamily("ml_result_cache_lookups", "Prediction result lookups by outcome", labels=["result"])
+        hits.add_metric(["local_hit"], results["local_hits"])
+        hits.add_metric(["redis_hit"], results["redis_hits"])
+        hits.add_metric(["miss"], results["misses"])
+        yield hits
+        yield CounterMetricFamily(
+            "ml_result_cache_invalidations", "Route invalidations after model replacement", value=results["invalidations"]
+        )
+
+    def publish(self):
+        """
+        Multiprocess mode: a collector only sees the worker serving the scrape, so each
+        worker mirrors its samples into live gauges that a scrape sums over the live
+        workers (a restarted worker's counts start again from zero).
+        """
+        for family in self.collect():
+            for sample in family.samples:
+                gauge = self._gauges.get(sample.name)
+                if gauge is None:
+                    # Budgets are per worker; everything else adds up across workers
+                    mode = "livemax" if sample.name.endswith("max_bytes") else "livesum"
+                    gauge = Gauge(
+                        sample.name, family.documentation, list(sample.labels), multiprocess_mode=mode, registry=None
+                    )
+                    self._gauges[sample.name] = gauge
+                (gauge.labels(**sample.labels) if sample.labels else gauge).set(sample.value)
+
+
+_cache_stats: Optional[CacheStatsCollector] = None
+
+
+def register_cache_stats(model_cache: Any, result_cache: Any):
+    global _cache_stats
+    _cache_stats = CacheStatsCollector(model_cache, result_cache)
+    if MULTIPROC_DIR is None:
+        REGISTRY.register(_cache_stats)
+
+
+def publish_cache_stats():
+    """Refresh this worker's cache gauges; a no-op outside multiprocess mode"""
+    if MULTIPROC_DIR is not None and _cache_stats is not None:
+        _cache_stats.publish()
+
+
+def clear_dead_workers():
+    """Drop the live gauges of worker processes that exited (uvicorn restarts them under new pids)"""
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, "gauge_live*_*.db")):
+        pid = int(os.path.basename(path)[:-len(".db")].rsplit("_", 1)[1])
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid, MULTIPROC_DIR)
+        except PermissionError:
+            pass
+
+
+def render_latest() -> bytes:
+    if MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY)
+    publish_cache_stats()
+    clear_dead_workers()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, MULTIPROC_DIR)
+    return generate_latest(registry)
+
@@ -0,0 +1,151 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+import numpy as np
+
+# Batch sizes the adaptive window treats as "no concurrency"
+SOLO_BATCH_EWMA = 1.5
+
+
+def _model_token(model: Any) -> Hashable:
+    # Route views of a shared model are new objects per request but share a version
+    return getattr(model, "version", None) or id(model)
+
+
+class _PendingBatch:
+    __slots__ = ("model", "token", "parts", "futures", "enqueued", "rows", "timer")
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.token = _model_token(model)
+        self.parts: List[np.ndarray] = []
+        self.futures: List[asyncio.Future] = []
+        self.enqueued: List[float] = []
+        self.rows = 0
+        self.timer: Optional[asyncio.Handle] = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent predictions for the same model into one call.
+
+    The first submission for a key opens a batch; later submissions join it
+    until `max_batch` rows are queued or the window closes, then one
+    vectorized `predict(model, X)` runs on `executor` (the loop's default
+    pool if None), so the event loop keeps serving other requests during
+    the pass, and each caller gets its own rows back. The window adapts per
+    key: while recent batches held a single request it closes on the next
+    loop iteration (only requests already ready join), and under
+    concurrency it stays open up to `max_wait` seconds, which bounds the
+    added latency.
+    """
+
+    def __init__(
+        self,
+        predict: Callable[[Any, np.ndarray], np.ndarray],
+        max_wait: float = 0.002,
+        max_batch: int = 256,
+        on_flush: Optional[Callable[[int, List[float]], None]] = None,
+        executor: Optional[Executor] = None
+    ):
+        self.predict = predict
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+        self.executor = executor
+        self._pending: Dict[Hashable, _PendingBatch] = {}
+        # Model passes in flight; referenced so they are not garbage collected mid-run
+        self._running: Set[asyncio.Task] = set()
+        # Moving average of requests per batch, by key
+        self._concurrency: Dict[Hashable, float] = {}
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.max_wait_seen = 0.0
+        self.wait_seconds = 0.0
+
+    async def submit(self, key: Hashable, model: Any, X: np.ndarray) -> np.ndarray:
+        """
+        Predict X with model, sharing the call with concurrent submissions for
+        the same key (a route); a different model version starts a new batch
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None or batch.token != _model_token(model):
+            if batch is not None:
+                self._flush(key, batch)
+            batch = _PendingBatch(model)
+            self._pending[key] = batch
+            if self._concurrency.get(key, 1.0) < SOLO_BATCH_EWMA or self.max_wait <= 0:
+                batch.timer = loop.call_soon(self._flush, key, batch)
+            else:
+                batch.timer = loop.call_later(self.max_wait, self._flush, key, batch)
+
+        future = loop.create_future()
+        batch.parts.append(X)
+        batch.futures.append(future)
+        batch.enqueued.append(time.perf_counter())
+        batch.rows += len(X)
+        # The timer cannot fire while the loop is busy, so submissions also enforce the window
+        if batch.rows >= self.max_batch or batch.enqueued[-1] - batch.enqueued[0] >= self.max_wait:
+            self._flush(key, batch)
+        return await future
+
+    def _flush(self, key: Hashable, batch: _PendingBatch):
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        started = time.perf_counter()
+        waits = [started - enqueued for enqueued in batch.enqueued]
+        previous = self._concurrency.get(key, 1.0)
+        self._concurrency[key] = previous + 0.2 * (len(batch.futures) - previous)
+        self.batches += 1
+        self.requests += len(batch.futures)
+        self.rows += batch.rows
+        self.wait_seconds += sum(waits)
+        self.max_wait_seen = max(self.max_wait_seen, max(waits))
+        if self.on_flush is not None:
+            self.on_flush(batch.rows, waits)
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _PendingBatch):
+        # Every caller went away (cancelled requests) before the pass started
+        if all(future.done() for future in batch.futures):
+            return
+        try:
+            X = batch.parts[0] if len(batch.parts) == 1 else np.concatenate(batch.parts)
+            outputs = await asyncio.get_running_loop().run_in_executor(self.executor, self.predict, batch.model, X)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for part, future in zip(batch.parts, batch.futures):
+            # Callers that went away (cancelled requests) are skipped
+            if not future.done():
+                future.set_result(outputs[offset:offset + len(part)])
+            offset += len(part)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_rows": self.max_batch,
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "avg_rows_per_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "avg_queue_wait_ms": round(self.wait_seconds / self.requests * 1000, 4) if self.requests else 0.0,
+            "max_queue_wait_ms": round(self.max_wait_seen * 1000, 4),
+            "open_batches": len(self._pending),
+            "running_batches": len(self._running)
+        }
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from forest_format import flatten_forest, load_forest, serialize_forest
+
+logger = logging.getLogger(__name__)
+
+ARENA_SUFFIX = ".skyf"
+
+
+class ModelArena:
+    """
+    Route forests shared by every worker process on a node.
+
+    Each model is one uncompressed forest file in `root` (tmpfs such as
+    /dev/shm by default). Workers memory-map the files read-only, so the node
+    arrays live once in the page cache however many workers serve the route.
+    Publishing replaces the file atomically; workers that mapped the old file
+    keep a valid mapping until they drop it, and `refresh` picks up files
+    another worker replaced.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        # Inode of the file each key was mapped from in this process
+        self._mapped: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.loaded = 0
+        self.refreshed = 0
+        self.released = 0
+        self.pruned = 0
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}{ARENA_SUFFIX}")
+
+    def _inode(self, key: str) -> Optional[int]:
+        try:
+            return os.stat(self.path(key)).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _map(self, key: str) -> Optional[Any]:
+        path = self.path(key)
+        try:
+            inode = os.stat(path).st_ino
+            forest = load_forest(path)
+        except FileNotFoundError:
+            return None
+        forest.shared = True
+        with self._lock:
+            self._mapped[key] = inode
+        return forest
+
+    def load(self, key: str) -> Optional[Any]:
+        """Map the shared copy of a model, or None if no worker has published it"""
+        forest = self._map(key)
+        if forest is not None:
+            self.loaded += 1
+        return forest
+
+    def publish(self, key: str, model: Any) -> Any:
+        """Write a model for all workers and return this process's mapped copy of it"""
+        data = serialize_forest(flatten_forest(model))
+        # Unique temporary name: several workers may publish the same route at once
+        tmp_path = os.path.join(self.root, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.published += 1
+        self.prune(keep=key)
+        return self._map(key)
+
+    def refresh(self, keys: List[str]) -> Dict[str, Optional[Any]]:
+        """
+        Re-map keys whose shared file was replaced since this process mapped it.
+        Keys whose file was pruned map to None and are forgotten; the caller must
+        drop its copy too, since the mapping keeps the unlinked tmpfs pages resident.
+        """
+        changed = {}
+        for key in keys:
+            mapped = self._mapped.get(key)
+            if mapped is None:
+                continue
+            inode = self._inode(key)
+            if inode == mapped:
+                continue
+            forest = self._map(key) if inode is not None else None
+            if forest is not None:
+                self.refreshed += 1
+            else:
+                self.forget(key)
+                self.released += 1
+            changed[key] = forest
+        return changed
+
+    def forget(self, key: str):
+        """Stop tracking a key this process no longer holds"""
+        with self._lock:
+            self._mapped.pop(key, None)
+
+    def _files(self) -> List[os.DirEntry]:
+        return [
+            entry for entry in os.scandir(self.root)
+            if entry.name.endswith(ARENA_SUFFIX) and entry.is_file()
+        ]
+
+    def used_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in self._files())
+
+    def prune(self, keep: Optional[str] = None) -> int:
+        """Remove the least recently published models over the byte budget; mapped copies stay valid"""
+        files = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        removed = 0
+        for entry in files:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and entry.name == f"{keep}{ARENA_SUFFIX}":
+                continue
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            self.pruned += removed
+            logger.info(f"Pruned {removed} models from the shared arena ({total / 1e6:.1f}MB left)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        files = self._files()
+        return {
+            "root": self.root,
+            "models": len(files),
+            "bytes": sum(entry.stat().st_size for entry in files),
+            "max_bytes": self.max_bytes,
+            "mapped_here": len(self._mapped),
+            "published": self.published,
+            "loaded": self.loaded,
+            "refreshed": self.refreshed,
+            "released": self.released,
+            "pruned": self.pruned
+        }
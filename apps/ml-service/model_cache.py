@@ -0,0 +1,142 @@
+import logging
+import pickle
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Approximate size of one sklearn tree node record (children, feature,
+# threshold, impurity, sample counts)
+TREE_NODE_BYTES = 64
+
+
+def estimate_model_size(model: Any) -> int:
+    """
+    Estimate the resident size of a model in bytes. Models mapped from the shared
+    arena are charged their full mapped size: a mapping keeps the tmpfs pages
+    resident even after the arena file is pruned, so it must count against the budget.
+    """
+    estimators = getattr(model, "estimators_", None)
+    if estimators is not None:
+        size = 0
+        for estimator in estimators:
+            tree = getattr(estimator, "tree_", None)
+            if tree is None:
+                return _pickled_size(model)
+            size += tree.node_count * TREE_NODE_BYTES + tree.value.nbytes
+        return size
+
+    nbytes = getattr(model, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    return _pickled_size(model)
+
+
+def _pickled_size(model: Any) -> int:
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class ModelCache:
+    """
+    In-process LRU cache of route models bounded by an estimated byte budget
+    """
+
+    def __init__(self, max_bytes: int, on_evict: Optional[Callable[[str, Any], None]] = None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.current_bytes = 0
+        # Part of current_bytes mapped from the shared arena (resident once per node, not per worker)
+        self.shared_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached model and mark it most recently used"""
+        model = self._entries.get(key)
+        if model is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return model
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Look up a model without touching recency or hit/miss counters"""
+        return self._entries.get(key)
+
+    def put(self, key: str, model: Any) -> None:
+        """Insert a model, evicting least recently used models over budget"""
+        if key in self._entries:
+            self._remove(key)
+
+        size = estimate_model_size(model)
+        self._entries[key] = model
+        self._sizes[key] = size
+        self.current_bytes += size
+        if getattr(model, "shared", False):
+            self.shared_bytes += size
+
+        # Never evict the entry just inserted, even if it alone exceeds the budget
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_key = next(iter(self._entries))
+            evicted_model = self._remove(evicted_key)
+            self.evictions += 1
+            logger.info(f"Evicted {evicted_key} from model cache ({self._format_usage()})")
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(evicted_key, evicted_model)
+                except Exception as e:
+                    logger.error(f"Error spilling evicted model {evicted_key}: {e}")
+
+    def _remove(self, key: str) -> Any:
+        model = self._entries.pop(key)
+        size = self._sizes.pop(key)
+        self.current_bytes -= size
+        if getattr(model, "shared", False):
+            self.shared_bytes -= size
+        return model
+
+    def _format_usage(self) -> str:
+        return f"{self.current_bytes / 1e6:.1f}MB of {self.max_bytes / 1e6:.1f}MB"
+
+    def keys(self) -> List[str]:
+        return list(self._entries.keys())
+
+    def size_of(self, key: str) -> int:
+        return self._sizes.get(key, 0)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries[key]
+
+    def __setitem__(self, key: str, model: Any) -> None:
+        self.put(key, model)
+
+    def __delitem__(self, key: str) -> None:
+        self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache occupancy and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "shared_bytes": self.shared_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
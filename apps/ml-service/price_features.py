@@ -0,0 +1,53 @@
+import numpy as np
+from calendar_table import CALENDAR
+
+# Feature encoding tables
+CABIN_ENCODING = {
+    "economy": 0,
+    "premium_economy": 1,
+    "business": 2,
+    "first": 3
+}
+
+# Column order of the route price model's feature matrix
+FEATURE_COLUMNS = [
+    "days_ahead",
+    "day_of_week",
+    "month",
+    "is_weekend",
+    "is_holiday_season",
+    "passengers",
+    "cabin_encoded",
+    "history_length",
+]
+
+
+def price_feature_matrix(
+    departure: np.ndarray,
+    booking: np.ndarray,
+    passengers: np.ndarray,
+    cabin_encoded: np.ndarray,
+    history_length: np.ndarray
+) -> np.ndarray:
+    """
+    Assemble the (n, 8) route model features from datetime64[D] departure and
+    booking dates; inputs broadcast, so grids can pass scalars for fixed columns.
+    """
+    departure, booking, passengers, cabin_encoded, history_length = np.broadcast_arrays(
+        departure, booking, passengers, cabin_encoded, history_length
+    )
+
+    # Calendar columns are one gather from the shared day table
+    days_ahead = (departure - booking).astype(np.int64)
+    calendar = CALENDAR.lookup(departure)
+
+    return np.column_stack([
+        days_ahead,
+        calendar["day_of_week"].astype(np.int64),
+        calendar["month"].astype(np.int64),
+        calendar["is_weekend"].astype(np.int64),
+        calendar["is_holiday_season"].astype(np.int64),
+        passengers.astype(np.int64),
+        cabin_encoded.astype(np.int64),
+        history_length.astype(np.int64)
+    ])
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures the circuit opens and calls are
+    skipped for `reset_timeout` seconds; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self):
+        """Give up a trial that ended without an outcome (the caller was cancelled)"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Redis circuit opened; serving from local tiers")
+            self.opened_at = time.monotonic()
+
+
+class RedisTier:
+    """
+    Async, pooled Redis access guarded by a circuit breaker.
+
+    Every call degrades to a miss (None / False) instead of raising, so
+    callers can fall through to the in-process and disk tiers.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 20,
+        socket_timeout: float = 0.25,
+        connect_timeout: float = 0.25,
+        breaker: Optional[CircuitBreaker] = None,
+        on_call: Optional[Callable[[str, str, float], None]] = None,
+    ):
+        self.pool = aioredis.ConnectionPool.from_url(
+            url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=connect_timeout,
+        )
+        self.client = aioredis.Redis(connection_pool=self.pool)
+        self.breaker = breaker or CircuitBreaker()
+        # Observer for (operation, outcome, seconds) of every call, e.g. a latency histogram
+        self.on_call = on_call
+        # Bound the wait for a free pooled connection as well as the socket I/O
+        self.call_timeout = socket_timeout + connect_timeout
+
+    async def _call(self, operation: str, coro_factory, default: Any = None) -> Any:
+        if not self.breaker.allow():
+            self._observe(operation, "circuit_open", 0.0)
+            return default
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro_factory(), timeout=self.call_timeout)
+        except asyncio.CancelledError:
+            # A client disconnect or request timeout says nothing about Redis, but a
+            # half-open trial left in flight would keep the circuit open for good
+            self.breaker.release_trial()
+            raise
+        except Exception as e:
+            self.breaker.record_failure()
+            self._observe(operation, "error", time.perf_counter() - started)
+            logger.error(f"Redis {operation} failed: {e!r}")
+            return default
+        self.breaker.record_success()
+        self._observe(operation, "ok", time.perf_counter() - started)
+        return result
+
+    def _observe(self, operation: str, outcome: str, seconds: float):
+        if self.on_call is not None:
+            self.on_call(operation, outcome, seconds)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call("get", lambda: self.client.get(key))
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        result = await self._call("mget", lambda: self.client.mget(keys))
+        return result if result is not None else [None] * len(keys)
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> bool:
+        return bool(await self._call("setex", lambda: self.client.setex(key, ttl, value), False))
+
+    async def set_many(self, items: Dict[str, bytes], ttl: int) -> bool:
+        """Write several keys with one pipelined round trip"""
+        if not items:
+            return True
+
+        async def run():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, value)
+                return await pipe.execute()
+
+        return await self._call("set_many", run) is not None
+
+    async def incr_scores(self, key: str, increments: Dict[str, float], ttl: int) -> bool:
+        """ZINCRBY several members of a sorted set and refresh its TTL in one round trip"""
+        if not increments:
+            return True
+
+        async def run():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for member, amount in increments.items():
+                    pipe.zincrby(key, amount, member)
+                pipe.expire(key, ttl)
+                return await pipe.execute()
+
+        return await self._call("incr_scores", run) is not None
+
+    async def top_scores(self, keys: List[str], n: int) -> List[Tuple[str, float]]:
+        """Top members by summed score across several sorted sets"""
+        if not keys or n <= 0:
+            return []
+
+        async def run():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.zrevrange(key, 0, n - 1, withscores=True)
+                return await pipe.execute()
+
+        totals: Dict[str, float] = {}
+        for members in await self._call("top_scores", run, []):
+            for member, score in members:
+                member = member.decode() if isinstance(member, bytes) else member
+                totals[member] = totals.get(member, 0.0) + score
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    async def delete(self, *keys: str) -> int:
+        return int(await self._call("delete", lambda: self.client.delete(*keys), 0))
+
+    async def ping(self) -> bool:
+        return bool(await self._call("ping", self.client.ping, False))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "max_connections": self.pool.max_connections,
+        }
+
+    async def close(self):
+        await self.pool.disconnect()
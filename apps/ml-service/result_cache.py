@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+REDIS_PREFIX = "ml_pred"
+
+
+class PredictionResultCache:
+    """
+    Two-tier cache of model outputs keyed on (route, model version, feature row).
+    Each entry holds `width` floats (e.g. a prediction and its spread).
+
+    The in-process tier is an LRU with TTL; the shared tier is Redis with the
+    same TTL. Because the model version is part of the key, a replaced model
+    never reads its predecessor's entries; local entries for the route are
+    also dropped eagerly on replacement.
+    """
+
+    def __init__(self, max_entries: int, ttl: int, redis_tier: Optional[Any] = None, width: int = 1):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.redis_tier = redis_tier
+        self.width = width
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, np.ndarray]]" = OrderedDict()
+        self._route_keys: Dict[str, Set[Tuple[str, str, str]]] = {}
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Moving average of model compute time per row, used to estimate time saved
+        self.compute_seconds_per_row = 0.0
+        self.saved_seconds = 0.0
+        self.lookup_seconds = 0.0
+
+    @staticmethod
+    def _row_key(row: np.ndarray) -> str:
+        return ",".join(map(str, row.tolist()))
+
+    def _redis_key(self, key: Tuple[str, str, str]) -> str:
+        return f"{REDIS_PREFIX}:{key[0]}:{key[1]}:{key[2]}"
+
+    def _decode(self, raw: Any) -> Optional[np.ndarray]:
+        text = raw.decode() if isinstance(raw, bytes) else str(raw)
+        value = np.array(text.split(","), dtype=np.float64)
+        # Entries written with a different width are treated as missing
+        return value if len(value) == self.width else None
+
+    async def get_many(self, route: str, version: str, X: np.ndarray) -> np.ndarray:
+        """Cached outputs for each row of X as an (n, width) matrix, NaN where missing"""
+        started = time.perf_counter()
+        now = time.monotonic()
+        values = np.full((len(X), self.width), np.nan)
+        keys = [(route, version, self._row_key(row)) for row in X]
+
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                values[i] = entry[1]
+                self.local_hits += 1
+            else:
+                missing.append(i)
+
+        if missing and self.redis_tier is not None:
+            cached = await self.redis_tier.mget([self._redis_key(keys[i]) for i in missing])
+            still_missing = []
+            for i, raw in zip(missing, cached):
+                value = self._decode(raw) if raw is not None else None
+                if value is None:
+                    still_missing.append(i)
+                    continue
+                values[i] = value
+                self._store(keys[i], values[i], now)
+                self.redis_hits += 1
+            missing = still_missing
+
+        self.misses += len(missing)
+        self.saved_seconds += (len(X) - len(missing)) * self.compute_seconds_per_row
+        self.lookup_seconds += time.perf_counter() - started
+        return values
+
+    async def put_many(self, route: str, version: str, X: np.ndarray, values: np.ndarray):
+        now = time.monotonic()
+        items = {}
+        values = np.asarray(values, dtype=np.float64).reshape(len(X), self.width)
+        for row, value in zip(X, values):
+            key = (route, version, self._row_key(row))
+            self._store(key, value.copy(), now)
+            items[self._redis_key(key)] = ",".join(map(repr, value.tolist())).encode()
+
+        if self.redis_tier is not None:
+            await self.redis_tier.set_many(items, self.ttl)
+
+    def _store(self, key: Tuple[str, str, str], value: np.ndarray, now: float):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (now + self.ttl, value)
+        self._route_keys.setdefault(key[0], set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            route_keys = self._route_keys.get(old_key[0])
+            if route_keys is not None:
+                route_keys.discard(old_key)
+
+    def record_compute(self, seconds: float, rows: int, alpha: float = 0.1):
+        """Feed the per-row compute time average used for the time-saved estimate"""
+        if rows <= 0:
+            return
+        per_row = seconds / rows
+        if self.compute_seconds_per_row == 0.0:
+            self.compute_seconds_per_row = per_row
+        else:
+            self.compute_seconds_per_row += alpha * (per_row - self.compute_seconds_per_row)
+
+    def invalidate_route(self, route: str):
+        """Drop local entries for a route whose model was replaced"""
+        for key in self._route_keys.pop(route, set()):
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "avg_compute_ms_per_row": round(self.compute_seconds_per_row * 1000, 4),
+            "lookup_ms": round(self.lookup_seconds * 1000, 2),
+            # Compute time avoided by hits, net of the time spent on lookups
+            "estimated_saved_ms": round((self.saved_seconds - self.lookup_seconds) * 1000, 2)
+        }
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Traffic scores are fetched for this many of the busiest routes; others rank as idle
+TRAFFIC_WINDOW = 1000
+
+
+class RetrainScheduler:
+    """
+    Background refresh of resident route models.
+
+    Every `check_interval` seconds, routes whose model is older than
+    `max_age` are ranked by recent traffic (busiest first, then oldest) and
+    up to `batch_size` of them are retrained with at most `max_concurrent`
+    jobs at a time, so serving keeps the remaining cores. `refresh(route)`
+    does the work and returns whether the new model was swapped in.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[bool]],
+        candidates: Callable[[], Dict[str, Optional[float]]],
+        traffic: Callable[[int], Awaitable[Dict[str, float]]],
+        max_age: float,
+        check_interval: float = 60.0,
+        max_concurrent: int = 1,
+        batch_size: int = 16,
+    ):
+        self.refresh = refresh
+        self.candidates = candidates
+        self.traffic = traffic
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.max_concurrent = max_concurrent
+        self.batch_size = batch_size
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight: set = set()
+        self.refreshed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.last_run_at: Optional[float] = None
+        self.last_due = 0
+
+    async def due_routes(self) -> List[str]:
+        """Stale resident routes in retraining order; models without a training time count as stale"""
+        now = time.time()
+        stale = {
+            route: trained_at
+            for route, trained_at in self.candidates().items()
+            if route not in self.in_flight and (trained_at is None or now - trained_at >= self.max_age)
+        }
+        self.last_due = len(stale)
+        if not stale:
+            return []
+
+        scores = await self.traffic(TRAFFIC_WINDOW)
+        return sorted(stale, key=lambda route: (-scores.get(route, 0.0), stale[route] or 0.0))
+
+    async def _retrain(self, route: str):
+        async with self._semaphore:
+            self.in_flight.add(route)
+            try:
+                if await self.refresh(route):
+                    self.refreshed += 1
+                else:
+                    self.rejected += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background retraining of {route} failed: {e}")
+            finally:
+                self.in_flight.discard(route)
+
+    async def run_once(self) -> List[str]:
+        """Retrain one batch of due routes and wait for it to finish"""
+        self.last_run_at = time.time()
+        routes = (await self.due_routes())[:self.batch_size]
+        if routes:
+            logger.info(f"Retraining {len(routes)} of {self.last_due} stale route models")
+            await asyncio.gather(*(self._retrain(route) for route in routes))
+        return routes
+
+    async def run_forever(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retraining scheduler cycle failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_age_seconds": self.max_age,
+            "check_interval_seconds": self.check_interval,
+            "max_concurrent": self.max_concurrent,
+            "in_flight": sorted(self.in_flight),
+            "due_last_cycle": self.last_due,
+            "refreshed": self.refreshed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "last_run_at": self.last_run_at
+        }
@@ -0,0 +1,44 @@
+import importlib.util
+import os
+
+import numpy as np
+
+import calendar_table
+
+ENGINE_CALENDAR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "ai-prediction-engine", "app", "ml", "calendar_table.py"
+)
+
+DEFINITIONS = (
+    "CALENDAR_VERSION",
+    "HOLIDAY_MONTHS",
+    "FIXED_HOLIDAYS",
+    "FLOATING_HOLIDAYS",
+    "SCHOOL_BREAKS",
+    "PEAK_HOLIDAY_DAYS",
+    "CALENDAR_COLUMNS",
+    "TABLE_START",
+    "TABLE_END",
+)
+
+
+def load_engine_calendar():
+    spec = importlib.util.spec_from_file_location("engine_calendar_table", ENGINE_CALENDAR)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_calendar_definitions_match_the_prediction_engine():
+    engine = load_engine_calendar()
+    for name in DEFINITIONS:
+        assert getattr(calendar_table, name) == getattr(engine, name), name
+
+
+def test_calendar_tables_match_the_prediction_engine():
+    engine = load_engine_calendar()
+    assert calendar_table.CALENDAR.start == engine.CALENDAR.start
+    assert np.array_equal(calendar_table.CALENDAR.rows, engine.CALENDAR.rows)
+    # Days outside the table are computed on demand by each copy
+    days = np.array(["1999-12-24", "2101-07-04"], dtype="datetime64[D]")
+    assert np.array_equal(calendar_table.calendar_features(days), engine.calendar_features(days))
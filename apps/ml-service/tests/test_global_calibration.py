@@ -0,0 +1,46 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault("ML_MODEL_DIR", tempfile.mkdtemp(prefix="ml-service-models-"))
+
+import main  # noqa: E402
+
+
+class Forest:
+    def __init__(self, version):
+        self.version = version
+
+    def predict(self, X):
+        return np.zeros(len(X))
+
+
+def test_swapped_forest_calibrates_routes_pending_on_the_old_one(monkeypatch):
+    forests = {"current": Forest("a")}
+
+    async def get_price_model(route):
+        return forests["current"]
+
+    def route_history(route, rows=10):
+        time.sleep(0.05)
+        return np.zeros((rows, 8)), np.full(rows, 300.0)
+
+    monkeypatch.setattr(main, "MODEL_MODE", "global")
+    monkeypatch.setattr(main, "global_model", None)
+    monkeypatch.setattr(main, "get_price_model", get_price_model)
+    monkeypatch.setattr(main, "route_history", route_history)
+
+    async def run():
+        await main.get_global_route_model("JFK-LAX")
+        forests["current"] = Forest("b")
+        await main.get_global_route_model("JFK-LAX")
+        assert set(main.calibration_tasks) == {("a", "JFK-LAX"), ("b", "JFK-LAX")}
+        await asyncio.gather(*main.calibration_tasks.values())
+
+    asyncio.run(run())
+    assert main.global_model.forest.version == "b"
+    assert main.global_model.for_route("JFK-LAX").offset > 0
+    assert not main.calibration_tasks
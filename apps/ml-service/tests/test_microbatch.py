@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from microbatch import MicroBatcher
+
+
+def test_forest_pass_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    pass_threads = []
+
+    def predict(model, X):
+        pass_threads.append(threading.get_ident())
+        time.sleep(0.05)
+        return X[:, 0] * model
+
+    async def run():
+        batcher = MicroBatcher(predict, max_wait=0.001)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticking = asyncio.create_task(ticker())
+        outputs = await asyncio.gather(*[
+            batcher.submit("route", 2.0, np.full((2, 1), i, dtype=float))
+            for i in range(4)
+        ])
+        ticking.cancel()
+        return outputs, ticks, batcher.stats()
+
+    outputs, ticks, stats = asyncio.run(run())
+    assert [output.tolist() for output in outputs] == [[2 * i, 2 * i] for i in range(4)]
+    assert pass_threads and loop_thread not in pass_threads
+    # The loop kept running other tasks while the 50 ms pass was in the executor
+    assert ticks >= 5
+    assert stats["running_batches"] == 0
+
+
+def test_cancelled_caller_is_skipped():
+    release = threading.Event()
+
+    def predict(model, X):
+        release.wait(1)
+        return X[:, 0]
+
+    async def run():
+        batcher = MicroBatcher(predict, max_wait=0.01)
+        first = asyncio.create_task(batcher.submit("route", None, np.array([[1.0]])))
+        second = asyncio.create_task(batcher.submit("route", None, np.array([[2.0]])))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        release.set()
+        result = await second
+        assert first.cancelled()
+        return result
+
+    assert asyncio.run(run()).tolist() == [2.0]
+
+
+def test_predict_error_reaches_every_caller():
+    def predict(model, X):
+        raise ValueError("bad batch")
+
+    async def run():
+        batcher = MicroBatcher(predict, max_wait=0.001)
+        return await asyncio.gather(
+            batcher.submit("route", None, np.array([[1.0]])),
+            batcher.submit("route", None, np.array([[2.0]])),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
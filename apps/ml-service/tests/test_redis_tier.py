@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from redis_tier import CircuitBreaker, RedisTier
+
+
+class FakeClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return b"value"
+
+
+def half_open_tier(client: FakeClient) -> RedisTier:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    tier = RedisTier("redis://localhost:6379/0", socket_timeout=5.0, breaker=breaker)
+    tier.client = client
+    return tier
+
+
+def test_cancelled_trial_does_not_keep_the_circuit_open():
+    async def run():
+        client = FakeClient(delay=1.0)
+        tier = half_open_tier(client)
+        assert tier.breaker.state == "half_open"
+
+        trial = asyncio.create_task(tier.get("key"))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+
+        client.delay = 0.0
+        return [await tier.get("key") for _ in range(3)], tier.breaker.state, client.calls
+
+    results, state, calls = asyncio.run(run())
+    assert results == [b"value"] * 3
+    assert state == "closed"
+    assert calls == 4
+
+
+def test_trial_in_flight_blocks_concurrent_calls():
+    async def run():
+        tier = half_open_tier(FakeClient(delay=0.05))
+        return await asyncio.gather(tier.get("key"), tier.get("key"))
+
+    assert asyncio.run(run()) == [b"value", None]
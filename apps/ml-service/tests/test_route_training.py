@@ -0,0 +1,67 @@
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+
+os.environ.setdefault("ML_MODEL_DIR", tempfile.mkdtemp(prefix="ml-service-models-"))
+
+import main  # noqa: E402
+
+
+class ConstantModel:
+    def __init__(self, price):
+        self.price = price
+
+    def predict(self, X):
+        return np.full(len(X), self.price)
+
+
+def stub_training(monkeypatch, price):
+    trained, stored = [], []
+
+    async def train_price_model(route):
+        trained.append(route)
+        await asyncio.sleep(0.02)
+        return ConstantModel(price)
+
+    async def store_price_model(route, model):
+        stored.append(model)
+        main.models[f"price_model_{route}"] = model
+
+    monkeypatch.setattr(main, "train_price_model", train_price_model)
+    monkeypatch.setattr(main, "store_price_model", store_price_model)
+    monkeypatch.setattr(main, "adopt_shared_models", lambda model_keys: [])
+    return trained, stored
+
+
+def test_refreshes_and_cold_loads_share_one_training(monkeypatch):
+    trained, stored = stub_training(monkeypatch, 300.0)
+    route = "SFO-SEA"
+
+    async def run():
+        return await asyncio.gather(
+            main.refresh_route_model(route),
+            main.retrain_model(route),
+            main.schedule_route_training(route)
+        )
+
+    refreshed, response, model = asyncio.run(run())
+    assert trained == [route]
+    assert len(stored) == 1 and model is stored[0]
+    assert refreshed is True and response["status"] == "success"
+    assert not main.training_tasks
+
+
+def test_rejected_refresh_keeps_the_serving_model(monkeypatch):
+    trained, stored = stub_training(monkeypatch, -1.0)
+    route = "SFO-PDX"
+    current = ConstantModel(250.0)
+    main.models[f"price_model_{route}"] = current
+
+    async def run():
+        return await asyncio.gather(main.refresh_route_model(route), main.refresh_route_model(route))
+
+    assert asyncio.run(run()) == [False, False]
+    assert trained == [route] and not stored
+    assert main.models.peek(f"price_model_{route}") is current
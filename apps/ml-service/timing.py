@@ -0,0 +1,171 @@
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from calendar_table import HOLIDAY_MONTHS
+from price_features import price_feature_matrix
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+DAY_NAMES = list(calendar.day_name)
+
+
+class TimingAnalysis:
+    """Price grid reductions for one route, cabin, model version and start date"""
+
+    def __init__(
+        self,
+        month_avg: np.ndarray,
+        weekday_avg: np.ndarray,
+        lead_curve: np.ndarray,
+        grid_points: int,
+        unique_points: int
+    ):
+        # Mean over departures in each month / weekday of the price at the best lead time (NaN if none)
+        self.month_avg = month_avg
+        self.weekday_avg = weekday_avg
+        # Mean price over all departures for each lead time (index 0 = 1 day ahead)
+        self.lead_curve = lead_curve
+        self.grid_points = grid_points
+        self.unique_points = unique_points
+
+    @property
+    def optimal_lead_time(self) -> int:
+        return int(np.argmin(self.lead_curve)) + 1
+
+    def best_months(
+        self,
+        n: int = 3,
+        preferred: Optional[List[str]] = None,
+        max_price: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Cheapest months, optionally limited to preferred months and a price ceiling"""
+        overall = float(np.nanmean(self.month_avg))
+        candidates = [i for i in range(12) if not np.isnan(self.month_avg[i])]
+
+        if preferred:
+            wanted = {name.strip().lower() for name in preferred}
+            matching = [i for i in candidates if MONTH_NAMES[i].lower() in wanted or MONTH_NAMES[i][:3].lower() in wanted]
+            candidates = matching or candidates
+        if max_price is not None:
+            affordable = [i for i in candidates if self.month_avg[i] <= max_price]
+            candidates = affordable or candidates
+
+        ranked = sorted(candidates, key=lambda i: self.month_avg[i])[:n]
+        return [
+            {
+                "month": MONTH_NAMES[i],
+                "avg_price": round(float(self.month_avg[i]), 2),
+                "savings": round(overall - float(self.month_avg[i]), 2)
+            }
+            for i in ranked
+        ]
+
+    def cheapest_days(self, n: int = 3) -> List[str]:
+        return [DAY_NAMES[i] for i in np.argsort(self.weekday_avg)[:n]]
+
+    def seasonal_analysis(self) -> Dict[str, float]:
+        """Relative price of peak, shoulder, off-season and holiday months vs the yearly mean"""
+        months = self.month_avg[~np.isnan(self.month_avg)]
+        overall = float(months.mean())
+        ranked = np.sort(months)
+        third = max(1, len(ranked) // 3)
+        holiday = np.isin(np.arange(1, 13), HOLIDAY_MONTHS) & ~np.isnan(self.month_avg)
+        non_holiday = ~np.isin(np.arange(1, 13), HOLIDAY_MONTHS) & ~np.isnan(self.month_avg)
+
+        holiday_premium = 0.0
+        if holiday.any() and non_holiday.any():
+            holiday_premium = float(self.month_avg[holiday].mean() / self.month_avg[non_holiday].mean() - 1)
+
+        return {
+            "peak_season_premium": round(float(ranked[-third:].mean() / overall - 1), 3),
+            "shoulder_season_discount": round(float(1 - ranked[third:-third].mean() / overall), 3)
+            if len(ranked) > 2 * third else 0.0,
+            "off_season_discount": round(float(1 - ranked[:third].mean() / overall), 3),
+            "holiday_premium": round(holiday_premium, 3)
+        }
+
+
+class TimingEngine:
+    """
+    Best-time-to-fly analysis from the route price model.
+
+    The whole departure date x booking lead time grid (365 x 180 by default)
+    is built as one feature matrix. Calendar features repeat across the year,
+    so only the distinct feature rows go through a single batched predict;
+    the prices are scattered back onto the grid and reduced with NumPy.
+    Results are cached per route, cabin, model version and start date.
+    """
+
+    def __init__(self, horizon_days: int = 365, max_lead_days: int = 180, cache_size: int = 1024):
+        self.horizon_days = horizon_days
+        self.max_lead_days = max_lead_days
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str, int, str], TimingAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def grid_features(self, start: np.datetime64, cabin_encoded: int) -> np.ndarray:
+        """(horizon * max_lead, 8) features, departure-major"""
+        departures = start + np.arange(self.horizon_days)
+        leads = np.arange(1, self.max_lead_days + 1)
+        departure = np.repeat(departures, self.max_lead_days)
+        booking = departure - np.tile(leads, self.horizon_days)
+        return price_feature_matrix(departure, booking, 1, cabin_encoded, 0)
+
+    def compute(self, model: Any, start: np.datetime64, cabin_encoded: int) -> TimingAnalysis:
+        features = self.grid_features(start, cabin_encoded)
+        unique_rows, inverse = np.unique(features, axis=0, return_inverse=True)
+        prices = model.predict(unique_rows)[inverse.reshape(-1)]
+        grid = prices.reshape(self.horizon_days, self.max_lead_days)
+
+        # Best achievable price per departure date, then grouped by calendar month / weekday
+        best = grid.min(axis=1)
+        departure_features = features[::self.max_lead_days]
+        month = departure_features[:, 2] - 1
+        weekday = departure_features[:, 1]
+        with np.errstate(invalid="ignore"):
+            month_avg = np.bincount(month, weights=best, minlength=12) / np.bincount(month, minlength=12)
+            weekday_avg = np.bincount(weekday, weights=best, minlength=7) / np.bincount(weekday, minlength=7)
+
+        return TimingAnalysis(
+            month_avg=month_avg,
+            weekday_avg=weekday_avg,
+            lead_curve=grid.mean(axis=0),
+            grid_points=len(features),
+            unique_points=len(unique_rows)
+        )
+
+    def analyze(
+        self, route: str, model: Any, cabin_encoded: int = 0, today: Optional[date] = None
+    ) -> TimingAnalysis:
+        """Cached analysis for departures from tomorrow through the horizon"""
+        start = np.datetime64(today or date.today(), "D") + 1
+        version = getattr(model, "version", None) or f"id-{id(model)}"
+        key = (route, version, cabin_encoded, str(start))
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        analysis = self.compute(model, start, cabin_encoded)
+        with self._lock:
+            self._cache[key] = analysis
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return analysis
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "grid": [self.horizon_days, self.max_lead_days]
+        }
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRAFFIC_KEY_PREFIX = "ml_route_traffic"
+TRAFFIC_KEY_TTL = 3 * 24 * 3600
+
+
+class RouteTraffic:
+    """
+    Per-route request counts, aggregated locally and flushed periodically to
+    daily Redis sorted sets so every worker can see recent traffic.
+    """
+
+    def __init__(self, redis_tier: Any, flush_interval: float = 30.0):
+        self.redis_tier = redis_tier
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+
+    def record(self, route: str, count: int = 1):
+        self._pending[route] += count
+
+    @staticmethod
+    def _day_key(day: datetime) -> str:
+        return f"{TRAFFIC_KEY_PREFIX}:{day.strftime('%Y%m%d')}"
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        if not await self.redis_tier.incr_scores(self._day_key(datetime.utcnow()), dict(pending), TRAFFIC_KEY_TTL):
+            # Keep the counts for the next flush if Redis is unavailable
+            self._pending.update(pending)
+
+    async def flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing route traffic: {e}")
+
+    async def top_routes(self, n: int) -> List[str]:
+        """Busiest routes over today and yesterday"""
+        return list(await self.scores(n))
+
+    async def scores(self, n: int) -> Dict[str, float]:
+        """Request counts of the `n` busiest routes over today and yesterday, plus unflushed local counts"""
+        today = datetime.utcnow()
+        keys = [self._day_key(today), self._day_key(today - timedelta(days=1))]
+        scores = dict(await self.redis_tier.top_scores(keys, n))
+        for route, count in self._pending.items():
+            scores[route] = scores.get(route, 0.0) + count
+        return dict(sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n])
+
+
+class WarmupProgress:
+    """Warm-up bookkeeping behind the /ready endpoint"""
+
+    def __init__(self):
+        self.status = "pending"
+        self.routes: List[str] = []
+        self.loaded = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self, routes: List[str]):
+        self.status = "warming"
+        self.routes = routes
+        self.started_at = time.time()
+
+    def finish(self):
+        self.status = "ready"
+        self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "total": len(self.routes),
+            "loaded": self.loaded,
+            "failed": self.failed,
+            "elapsed_seconds": elapsed
+        }
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+SkyScout AI microbenchmarks for the Python prediction and training hot paths.
+
+Covers ml-service (feature extraction, /predict/price end to end, flat forest
+serialize/load, per-route vs global model serving) and ai-prediction-engine (PricePredictionModel.predict,
+prepare_features/encode_categorical_features, train, save/load). Redis is
+replaced by an in-memory stand-in, so no services need to be running.
+
+Each benchmark reports p50/p99/mean latency, throughput and peak traced
+memory; the report is JSON so runs can be diffed across commits:
+
+    python scripts/testing/ml_benchmarks.py --output bench.json
+    python scripts/testing/ml_benchmarks.py --compare bench.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+ML_SERVICE_DIR = os.path.join(ROOT, 'apps', 'ml-service')
+AI_ENGINE_DIR = os.path.join(ROOT, 'apps', 'ai-prediction-engine')
+
+AIRLINES = ['AA', 'DL', 'UA', 'BA', 'LH', 'AF']
+AIRPORTS = ['JFK', 'LAX', 'SFO', 'ORD', 'LHR', 'CDG', 'FRA', 'SEA']
+
+
+class InMemoryRedisTier:
+    """Stand-in for redis_tier.RedisTier backed by dicts (TTLs are ignored)"""
+
+    def __init__(self):
+        self.values: Dict[str, bytes] = {}
+        self.scores: Dict[str, Dict[str, float]] = {}
+        self.round_trips = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.round_trips += 1
+        return self.values.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> bool:
+        self.round_trips += 1
+        self.values[key] = value
+        return True
+
+    async def set_many(self, items: Dict[str, bytes], ttl: int) -> bool:
+        self.round_trips += 1
+        self.values.update(items)
+        return True
+
+    async def incr_scores(self, key: str, increments: Dict[str, float], ttl: int) -> bool:
+        self.round_trips += 1
+        scores = self.scores.setdefault(key, {})
+        for member, amount in increments.items():
+            scores[member] = scores.get(member, 0.0) + amount
+        return True
+
+    async def top_scores(self, keys: List[str], n: int) -> List[Tuple[str, float]]:
+        self.round_trips += 1
+        totals: Dict[str, float] = {}
+        for key in keys:
+            for member, score in self.scores.get(key, {}).items():
+                totals[member] = totals.get(member, 0.0) + score
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    async def delete(self, *keys: str) -> int:
+        self.round_trips += 1
+        return sum(self.values.pop(key, None) is not None for key in keys)
+
+    async def ping(self) -> bool:
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return {"circuit": "in_memory", "consecutive_failures": 0, "max_connections": 0}
+
+    async def close(self):
+        pass
+
+
+class BenchmarkRunner:
+    """Collects latency samples and peak memory per benchmark"""
+
+    def __init__(self, iterations: int, warmup: int, only: Optional[str] = None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.only = only
+        self.results: List[Dict[str, Any]] = []
+
+    def wanted(self, name: str) -> bool:
+        return self.only is None or self.only in name
+
+    def _record(self, name: str, samples: List[float], items: int, peak_bytes: Optional[int],
+                params: Dict[str, Any]):
+        seconds = np.asarray(samples)
+        result = {
+            'name': name,
+            'params': params,
+            'iterations': len(samples),
+            'items_per_call': items,
+            'p50_ms': round(float(np.percentile(seconds, 50)) * 1000, 4),
+            'p99_ms': round(float(np.percentile(seconds, 99)) * 1000, 4),
+            'mean_ms': round(float(seconds.mean()) * 1000, 4),
+            'throughput_per_s': round(items * len(samples) / float(seconds.sum()), 2),
+            'peak_memory_mb': None if peak_bytes is None else round(peak_bytes / (1024 * 1024), 3),
+        }
+        self.results.append(result)
+        print(
+            f"{name:<48} p50 {result['p50_ms']:>10.3f}ms  p99 {result['p99_ms']:>10.3f}ms  "
+            f"{result['throughput_per_s']:>12.1f}/s  peak {result['peak_memory_mb'] or 0:>8.2f}MB",
+            file=sys.stderr
+        )
+
+    def run(self, name: str, fn: Callable[[], Any], items: int = 1,
+            iterations: Optional[int] = None, **params):
+        """Time fn() synchronously; peak memory comes from one extra traced call"""
+        if not self.wanted(name):
+            return
+        iterations = iterations or self.iterations
+        for _ in range(min(self.warmup, iterations)):
+            fn()
+
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._record(name, samples, items, peak, params)
+
+    async def run_async(self, name: str, fn: Callable[[], Awaitable[Any]], items: int = 1,
+                        iterations: Optional[int] = None, **params):
+        """Async variant of run(), timed inside the running event loop"""
+        if not self.wanted(name):
+            return
+        iterations = iterations or self.iterations
+        for _ in range(min(self.warmup, iterations)):
+            await fn()
+
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        await fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._record(name, samples, items, peak, params)
+
+
+# ml-service
+
+def price_requests(n: int) -> List[Dict[str, Any]]:
+    """Distinct /predict/price payloads (distinct feature rows up to 365 * 60 requests)"""
+    base = datetime(2025, 1, 1)
+    return [
+        {
+            'origin': 'JFK',
+            'destination': 'LAX',
+            'departure_date': (base + timedelta(days=60 + i % 365)).strftime('%Y-%m-%d'),
+            'booking_date': (base + timedelta(days=i // 365 % 60)).strftime('%Y-%m-%d'),
+            'passengers': 1 + i % 3,
+            'cabin': 'economy' if i % 4 else 'business',
+        }
+        for i in range(n)
+    ]
+
+
+def route_payloads(routes: List[Tuple[str, str]], n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """/predict/price payloads spread over many routes, with distinct dates so results are not cached"""
+    rng = np.random.default_rng(seed)
+    base = datetime(2025, 1, 1)
+    picks = rng.integers(0, len(routes), n)
+    days = rng.integers(1, 365, n)
+    leads = rng.integers(1, 180, n)
+    return [
+        {
+            'origin': routes[picks[i]][0],
+            'destination': routes[picks[i]][1],
+            'departure_date': (base + timedelta(days=int(days[i]) + 180)).strftime('%Y-%m-%d'),
+            'booking_date': (base + timedelta(days=int(days[i]) + 180 - int(leads[i]))).strftime('%Y-%m-%d'),
+        }
+        for i in range(n)
+    ]
+
+
+async def bench_route_modes(runner: BenchmarkRunner, main: Any, client: Any, n_routes: int, samples: int = 4):
+    """
+    Per-route forests vs one global forest with per-route calibration at n_routes.
+
+    Per-route mode is not materialized n_routes times: routes reuse `samples`
+    fitted forests and its footprint is reported as n_routes x forest bytes
+    (each route owns its arrays in that mode). Reused forests stay hotter in
+    CPU caches than distinct ones would, so its latency is a lower bound.
+    """
+    if not runner.wanted('ml_service.route_mode'):
+        return
+    from global_model import GlobalPriceModel
+
+    codes = [''.join(code) for code in itertools.product(string.ascii_uppercase, repeat=3)]
+    routes = [(codes[i // 100], codes[-1 - i % 100]) for i in range(n_routes)]
+    payloads = iter(route_payloads(routes, 2 * (runner.iterations + runner.warmup) + 2))
+
+    async def post():
+        response = await client.post('/predict/price', json=next(payloads))
+        response.raise_for_status()
+
+    forests = [main.fit_price_model(f'SAMPLE-{i}') for i in range(samples)]
+    per_route_bytes = n_routes * int(np.mean([forest.nbytes for forest in forests]))
+    max_bytes = main.models.max_bytes
+    main.models.max_bytes = float('inf')
+    keys = [f'price_model_{origin}-{destination}' for origin, destination in routes]
+    for i, key in enumerate(keys):
+        main.models[key] = forests[i % samples]
+    await runner.run_async(f'ml_service.route_mode.per_route.predict_price[{n_routes}]', post,
+                           routes=n_routes, model_bytes=per_route_bytes)
+    for key in keys:
+        del main.models[key]
+    main.models.max_bytes = max_bytes
+
+    forest = main.fit_price_model(main.GLOBAL_MODEL_ROUTE)
+    main.models[f'price_model_{main.GLOBAL_MODEL_ROUTE}'] = forest
+    main.global_model = GlobalPriceModel(forest, main.CALIBRATION_PRIOR_ROWS)
+    X, y = main.route_history('JFK-LAX')
+    runner.run('ml_service.route_mode.global.calibrate_route', lambda: main.global_model.calibrate('JFK-LAX', X, y),
+               iterations=max(3, runner.iterations // 10))
+    offsets = np.random.default_rng(1).normal(0, 25, n_routes)
+    for (origin, destination), offset in zip(routes, offsets):
+        main.global_model.calibration.set(f'{origin}-{destination}', float(offset), 1000)
+
+    main.MODEL_MODE = 'global'
+    try:
+        await runner.run_async(f'ml_service.route_mode.global.predict_price[{n_routes}]', post,
+                               routes=n_routes, model_bytes=main.global_model.nbytes)
+    finally:
+        main.MODEL_MODE = 'route'
+
+
+async def bench_ml_service(runner: BenchmarkRunner, batch_sizes: List[int], workdir: str, n_routes: int):
+    os.environ.setdefault('ML_MODEL_DIR', os.path.join(workdir, 'ml-service-models'))
+    sys.path.insert(0, ML_SERVICE_DIR)
+    import httpx
+    import main
+    from forest_format import deserialize_forest, load_forest, serialize_forest, write_forest
+
+    # Every tier that talks to Redis shares one in-memory stand-in
+    redis = InMemoryRedisTier()
+    main.redis_client = redis
+    main.result_cache.redis_tier = redis
+    main.route_traffic.redis_tier = redis
+
+    single = main.FlightPredictionRequest(**price_requests(1)[0])
+    runner.run('ml_service.extract_features', lambda: main.extract_features(single))
+    for n in batch_sizes:
+        batch = [main.FlightPredictionRequest(**payload) for payload in price_requests(n)]
+        runner.run(f'ml_service.extract_features_batch[{n}]', lambda: main.extract_features_batch(batch),
+                   items=n, rows=n)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def post(payload):
+            response = await client.post('/predict/price', json=payload)
+            response.raise_for_status()
+
+        # First call trains and stores the route model; the timed calls then hit the memory tier
+        started = time.perf_counter()
+        await post(price_requests(1)[0])
+        runner._record('ml_service.predict_price.cold_route', [time.perf_counter() - started], 1, None, {})
+
+        repeated = price_requests(1)[0]
+        await runner.run_async('ml_service.predict_price.result_cache_hit', lambda: post(repeated))
+
+        fresh = iter(price_requests(runner.iterations + runner.warmup + 2)[1:])
+        await runner.run_async('ml_service.predict_price.result_cache_miss', lambda: post(next(fresh)))
+
+        # Concurrent distinct requests for one route, each its own model call vs coalesced
+        concurrency = 32
+        burst = iter(route_payloads([('JFK', 'LAX')], 2 * concurrency * (runner.iterations + runner.warmup + 2), seed=7))
+        max_batch = main.micro_batcher.max_batch
+        for label, rows in (('unbatched', 1), ('microbatched', max_batch)):
+            main.micro_batcher.max_batch = rows
+            await runner.run_async(
+                f'ml_service.predict_price.concurrent[{concurrency}].{label}',
+                lambda: asyncio.gather(*(post(next(burst)) for _ in range(concurrency))),
+                items=concurrency, concurrency=concurrency
+            )
+        main.micro_batcher.max_batch = max_batch
+
+        # Bulk demand forecast stream; peak memory should not grow with the route count. The
+        # generator is consumed directly because httpx's ASGI transport buffers whole responses.
+        async def stream_forecasts(routes, chunks):
+            async for _ in main.stream_demand_forecasts(routes, chunks, 'daily'):
+                pass
+
+        codes = [''.join(code) for code in itertools.product(string.ascii_uppercase, repeat=3)]
+        chunks = main.forecast_chunks(np.datetime64('2025-01-01'), np.datetime64('2025-12-31'), 'daily',
+                                      main.FORECAST_CHUNK_DAYS)
+        for n in (100, 1000):
+            routes = [main.ForecastRoute(origin=codes[i], destination=codes[-1 - i]) for i in range(n)]
+            await runner.run_async(f'ml_service.forecast_demand_bulk[{n}]', lambda: stream_forecasts(routes, chunks),
+                                   iterations=max(3, runner.iterations // 20), items=n, routes=n, days=365)
+
+        await bench_route_modes(runner, main, client, n_routes)
+
+    model = await main.get_price_model('JFK-LAX')
+    features = main.extract_features_batch(
+        [main.FlightPredictionRequest(**payload) for payload in price_requests(max(batch_sizes))]
+    )
+    # Sorted and deduplicated so a requested size of 1 is not reported twice
+    for n in sorted({1, *batch_sizes}):
+        runner.run(f'ml_service.model_predict[{n}]', lambda: model.predict(features[:n]), items=n, rows=n)
+    # Per-tree spread overhead over the plain predict above
+    from uncertainty import predict_with_spread
+    for n in batch_sizes:
+        runner.run(f'ml_service.predict_with_spread[{n}]', lambda: predict_with_spread(model, features[:n]),
+                   items=n, rows=n)
+    # The same spread rows read from the model's precomputed feature-grid table
+    from lookup_table import LookupTableCache
+    tables = LookupTableCache(os.path.join(workdir, 'tables'), predict_with_spread)
+    table = tables.load_or_build(model)
+    if table is not None:
+        for n in batch_sizes:
+            runner.run(f'ml_service.lookup_table[{n}]', lambda: table.lookup(features[:n]),
+                       items=n, rows=n, table_bytes=table.nbytes)
+
+    blob = serialize_forest(model)
+    path = os.path.join(workdir, 'bench.skyf')
+    runner.run('ml_service.serialize_forest', lambda: serialize_forest(model), model_bytes=len(blob))
+    runner.run('ml_service.deserialize_forest', lambda: deserialize_forest(blob), model_bytes=len(blob))
+    runner.run('ml_service.write_forest', lambda: write_forest(path, model), model_bytes=len(blob))
+    runner.run('ml_service.load_forest', lambda: load_forest(path).predict(features[:1]), model_bytes=len(blob))
+
+    main.training_executor.shutdown(wait=True)
+
+
+# ai-prediction-engine
+
+def flight_rows(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic training/inference rows in the PricePredictionModel input schema"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now()
+    origins = rng.integers(0, len(AIRPORTS), n)
+    offsets = rng.integers(1, len(AIRPORTS), n)
+    airlines = rng.integers(0, len(AIRLINES), n)
+    days = rng.integers(-5, 300, n)
+    hours = rng.integers(0, 24, n)
+    durations = rng.integers(60, 720, n)
+    stops = rng.integers(0, 3, n)
+    business = rng.random(n) < 0.2
+    prices = rng.random(n) * 800 + 100
+
+    return [
+        {
+            'airline': AIRLINES[airlines[i]],
+            'origin': AIRPORTS[origins[i]],
+            'destination': AIRPORTS[(origins[i] + offsets[i]) % len(AIRPORTS)],
+            'cabin': 'business' if business[i] else 'economy',
+            'departure_date': (now + timedelta(days=int(days[i]), hours=int(hours[i]))).strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': float(durations[i]),
+            'stops': int(stops[i]),
+            'price': float(prices[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_ai_engine(runner: BenchmarkRunner, row_counts: List[int], train_sizes: List[int],
+                    workdir: str, parallel_training: bool):
+    sys.path.insert(0, AI_ENGINE_DIR)
+    import pandas as pd
+    from app.ml.price_prediction import PricePredictionModel
+
+    for n in train_sizes:
+        name = f'ai_engine.train[{n}]'
+        if not runner.wanted(name):
+            continue
+        data = pd.DataFrame(flight_rows(n, seed=n))
+        model_dir = os.path.join(workdir, f'train-{n}')
+        runner.run(
+            name, lambda: PricePredictionModel(model_dir).train(data, parallel=parallel_training),
+            items=n, iterations=1, rows=n, parallel=parallel_training
+        )
+
+    model_dir = os.path.join(workdir, 'ai-engine-model')
+    model = PricePredictionModel(model_dir)
+    model.train(pd.DataFrame(flight_rows(max(train_sizes), seed=1)), parallel=parallel_training)
+
+    for n in row_counts:
+        frame = pd.DataFrame(flight_rows(n, seed=2))
+        prepared = model.prepare_features(frame)
+        runner.run(f'ai_engine.prepare_features[{n}]', lambda: model.prepare_features(frame), items=n, rows=n)
+        runner.run(f'ai_engine.encode_categorical_features[{n}]',
+                   lambda: model.encode_categorical_features(prepared), items=n, rows=n)
+
+    rows = flight_rows(max(row_counts), seed=3)
+    runner.run('ai_engine.predict', lambda: model.predict(rows[0]))
+    for n in row_counts:
+        runner.run(f'ai_engine.predict_batch[{n}]', lambda: model.predict_batch(rows[:n]), items=n, rows=n)
+
+    # Forest predict vs the per-tree spread that replaces it in predict_batch
+    forest = model.models.get('random_forest')
+    spread = model.tree_spread()
+    if forest is not None and spread is not None:
+        X = model.feature_pipeline.transform(rows)
+        for n in sorted({1, *row_counts}):
+            runner.run(f'ai_engine.forest_predict[{n}]', lambda: forest.predict(X[:n]), items=n, rows=n)
+            runner.run(f'ai_engine.predict_with_spread[{n}]', lambda: spread.summarize(X[:n]), items=n, rows=n)
+
+    runner.run('ai_engine.save_models', model.save_models, iterations=max(3, runner.iterations // 10))
+    runner.run('ai_engine.load_models', lambda: PricePredictionModel(model_dir).load_models(),
+               iterations=max(3, runner.iterations // 10))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: str):
+    """Print p50/p99/peak-memory ratios against an earlier report"""
+    with open(baseline_path) as f:
+        baseline = {result['name']: result for result in json.load(f)['results']}
+
+    print(f"\nvs {baseline_path}", file=sys.stderr)
+    for result in report['results']:
+        before = baseline.get(result['name'])
+        if before is None:
+            continue
+        ratios = []
+        for key in ('p50_ms', 'p99_ms', 'peak_memory_mb'):
+            ratios.append(f"{key} x{result[key] / before[key]:.2f}" if before[key] and result[key] else f"{key} n/a")
+        print(f"{result['name']:<48} " + '  '.join(ratios), file=sys.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Microbenchmarks for the ML prediction and training paths')
+    parser.add_argument('--suite', choices=['all', 'ml-service', 'ai-engine'], default='all')
+    parser.add_argument('--only', help='run benchmarks whose name contains this substring')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='row counts for the feature and batch-predict benchmarks')
+    parser.add_argument('--train-sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--routes', type=int, default=10000,
+                        help='route count for the per-route vs global model comparison')
+    parser.add_argument('--serial-training', action='store_true', help='train ensemble members in-process')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    runner = BenchmarkRunner(args.iterations, args.warmup, args.only)
+    with tempfile.TemporaryDirectory(prefix='skyscout-bench-') as workdir:
+        if args.suite in ('all', 'ml-service'):
+            asyncio.run(bench_ml_service(runner, args.rows, workdir, args.routes))
+        if args.suite in ('all', 'ai-engine'):
+            bench_ai_engine(runner, args.rows, args.train_sizes, workdir, not args.serial_training)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'iterations': args.iterations,
+        'results': runner.results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
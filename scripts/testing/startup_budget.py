@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+SkyScout AI cold-start budget check.
+
+Measures, in fresh interpreters, how long the Python services take to import
+their serving modules and how long ml-service takes to answer its first
+request, and exits non-zero when any measurement exceeds its budget in
+startup-budget.json. Serving modules must also not pull in training-only
+packages (pandas, sklearn, deep learning frameworks) at import time.
+
+Usage (from the project root):
+    python scripts/testing/startup_budget.py [--config path] [--json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), 'startup-budget.json')
+
+IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = sorted({{name.split('.')[0] for name in sys.modules}})
+print(json.dumps({{"seconds": elapsed, "modules": loaded}}))
+"""
+
+
+def measure_import(cwd: str, module: str) -> dict:
+    """Import time of one module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_PROBE.format(module=module)],
+        cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_boot(cwd: str, app: str, path: str, timeout: float) -> float:
+    """Seconds from process start until `path` answers with any HTTP status"""
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{app} exited with code {proc.returncode} before serving")
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=0.5)
+                return time.perf_counter() - started
+            except urllib.error.HTTPError:
+                # A 503 from /health or /ready still means the server is accepting requests
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"{app} did not answer {path} within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check Python service cold-start budgets')
+    parser.add_argument('--config', default=DEFAULT_CONFIG)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = json.load(f)
+    repeats = config.get('repeats', 3)
+
+    report, failures = {'imports': {}, 'boot': {}}, []
+
+    for name, spec in config.get('imports', {}).items():
+        runs = [measure_import(os.path.join(ROOT, spec['cwd']), spec['module']) for _ in range(repeats)]
+        seconds = statistics.median(run['seconds'] for run in runs)
+        heavy = sorted(set(spec.get('forbidden_modules', [])) & set(runs[0]['modules']))
+        report['imports'][name] = {
+            'seconds': round(seconds, 3),
+            'budget_seconds': spec['budget_seconds'],
+            'forbidden_loaded': heavy
+        }
+        if seconds > spec['budget_seconds']:
+            failures.append(f"{name}: import took {seconds:.2f}s (budget {spec['budget_seconds']}s)")
+        if heavy:
+            failures.append(f"{name}: serving import loaded {', '.join(heavy)}")
+
+    for name, spec in config.get('boot', {}).items():
+        budget = spec['budget_seconds']
+        try:
+            seconds = statistics.median(
+                measure_boot(os.path.join(ROOT, spec['cwd']), spec['app'], spec['path'], budget * 4)
+                for _ in range(repeats)
+            )
+        except (RuntimeError, TimeoutError) as e:
+            failures.append(f"{name}: {e}")
+            continue
+        report['boot'][name] = {'seconds': round(seconds, 3), 'budget_seconds': budget}
+        if seconds > budget:
+            failures.append(f"{name}: boot took {seconds:.2f}s (budget {budget}s)")
+
+    report['failures'] = failures
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for section in ('imports', 'boot'):
+            for name, result in report[section].items():
+                print(f"{section:<8} {name:<24} {result['seconds']:>7.3f}s  (budget {result['budget_seconds']}s)")
+        for failure in failures:
+            print(f"FAIL {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())